@@ -1,16 +1,30 @@
 #!/usr/bin/env python3
 """
 Step 1: Extract unlocalized UI strings from Flutter app
-Outputs: custom_unlocalized.txt
+Outputs: custom_unlocalized.txt, extraction_manifest.json
 Handles multi-line patterns like:
   Text(
     'string on next line'
   )
+
+Usage:
+  python 1_extract_unlocalized.py           # every UI literal
+  python 1_extract_unlocalized.py --delta   # only literals not already in app_en.arb
 """
+import argparse
+import importlib
+import json
 import os
 import re
 from pathlib import Path
 
+from arb_utils import load_arb, normalise_text, value_index
+from artifact_store import write_artifact
+from l10n_rules import load_rules
+
+# Step scripts start with a digit, so they can't be imported by name
+generate_step = importlib.import_module("2_generate_arb")
+
 # === Paths ===
 # === Paths ===
 ROOT = Path(__file__).resolve().parents[2]
@@ -18,50 +32,14 @@ OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 APP_LIB = ROOT / "lib"
 OUTPUT_FILE = OUTPUT_DIR / "custom_unlocalized.txt"
+EN_ARB = APP_LIB / "l10n" / "app_en.arb"
+# (file, byte offset, literal, key) for every occurrence; consumed by step 3 --manifest
+MANIFEST_FILE = OUTPUT_DIR / "extraction_manifest.json"
 
-# === Exclusions ===
-EXCLUDE_DIRS = {"l10n", "generated", ".dart_tool", "build"}
-EXCLUDE_FILES = {"*.g.dart", "*.freezed.dart"}
-
-# Exclude lines with logging, imports, debug, etc.
-EXCLUDE_LINE_PATTERNS = [
-    r'^\s*(import|export|part)\s',
-    r'(debugPrint|print|log\.|logger\.|SharedLoggingUtility\.)',
-]
-EXCLUDE_LINE_REGEX = re.compile('|'.join(EXCLUDE_LINE_PATTERNS), re.IGNORECASE)
-
-# === UI Text Patterns (Multi-line aware) ===
-# These patterns will work across multiple lines
-UI_TEXT_PATTERNS = [
-    # Text widgets - handles newlines between Text( and 'string'
-    r'Text\s*\(\s*["\']([^"\']+)["\']',
-    r'SelectableText\s*\(\s*["\']([^"\']+)["\']',
-    
-    # TextSpan with property name
-    r'TextSpan\s*\(\s*text\s*:\s*["\']([^"\']+)["\']',
-    
-    # Input decoration properties
-    r'labelText\s*:\s*["\']([^"\']+)["\']',
-    r'hintText\s*:\s*["\']([^"\']+)["\']',
-    r'helperText\s*:\s*["\']([^"\']+)["\']',
-    r'errorText\s*:\s*["\']([^"\']+)["\']',
-    r'prefixText\s*:\s*["\']([^"\']+)["\']',
-    r'suffixText\s*:\s*["\']([^"\']+)["\']',
-    r'counterText\s*:\s*["\']([^"\']+)["\']',
-    
-    # Common UI properties
-    r'tooltip\s*:\s*["\']([^"\']+)["\']',
-    r'placeholder\s*:\s*["\']([^"\']+)["\']',
-    r'semanticLabel\s*:\s*["\']([^"\']+)["\']',
-    
-    # Dialog/Snackbar content
-    r'SnackBar\s*\(\s*content\s*:\s*Text\s*\(\s*["\']([^"\']+)["\']',
-    
-    # AppBar/Card/ListTile titles
-    r'title\s*:\s*Text\s*\(\s*["\']([^"\']+)["\']',
-    r'subtitle\s*:\s*Text\s*\(\s*["\']([^"\']+)["\']',
-    r'label\s*:\s*Text\s*\(\s*["\']([^"\']+)["\']',
-]
+# === Rules ===
+# Patterns, exclusions and non-UI words live in extraction_rules.json
+RULES = load_rules()
+EXCLUDE_DIRS = RULES.exclude_dirs
 
 # === Validation ===
 def is_valid_ui_string(text: str) -> bool:
@@ -94,70 +72,171 @@ def is_valid_ui_string(text: str) -> bool:
             return False
     
     # Exclude common non-UI strings
-    non_ui = [
-        'null', 'true', 'false', 'const', 'var', 'final', 'return',
-        'async', 'await', 'void', 'class', 'extends', 'implements',
-        'http', 'https', 'www', '.com', '.json', '.png', '.jpg',
-        'widget', 'build', 'state',
-    ]
-    
-    if text.lower() in non_ui or any(x in text.lower() for x in ['.com', 'http', 'www.', '.json']):
+    if RULES.is_non_ui(text):
         return False
     
     return True
 
-def clean_content(content: str) -> str:
-    """Remove comments and unwanted content."""
-    # Remove single-line comments
-    content = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-    # Remove multi-line comments
-    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-    return content
+# === Interpolation ===
+DART_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+ICU_PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+TRAILING_CALL = re.compile(r'\.\s*[A-Za-z_]\w*\(\s*\)$')
+DOTTED_PATH = re.compile(r'^[A-Za-z_]\w*(?:\s*\??\.\s*[A-Za-z_]\w*)*$')
 
-def extract_from_file(file_path: Path) -> set:
-    """Extract valid UI strings from a single Dart file."""
+def placeholder_name(expr: str, index: int) -> str:
+    """Name a placeholder after its expression: habit.name -> name, x.toString() -> x."""
+    expr = expr.strip()
+    while TRAILING_CALL.search(expr):
+        expr = TRAILING_CALL.sub('', expr)
+    if DOTTED_PATH.match(expr):
+        name = DART_IDENTIFIER.findall(expr)[-1]
+        return name[0].lower() + name[1:]
+    return f"value{index}"
+
+def parse_interpolation(text: str):
+    """
+    Turn a Dart literal with $var / ${expr} into an ICU message.
+    Returns (message, [(placeholder, expression), ...]) in order of first
+    use, or None if the literal can't be converted safely.
+    """
+    parts = []
+    args = []
+    names = {}  # expression -> placeholder
+    i = 0
+    
+    while i < len(text):
+        c = text[i]
+        if c == '\\' and i + 1 < len(text):
+            # \$ and escaped quotes stand for the bare character; other
+            # escapes (\n, \t, \u....) stay verbatim as in plain literals
+            escaped = text[i + 1]
+            parts.append(escaped if escaped in '$\'"' else text[i:i + 2])
+            i += 2
+            continue
+        if c in '{}':
+            return None  # would be read as ICU syntax
+        if c != '$':
+            parts.append(c)
+            i += 1
+            continue
+        
+        if text.startswith('${', i):
+            depth = 1
+            j = i + 2
+            while j < len(text) and depth:
+                depth += {'{': 1, '}': -1}.get(text[j], 0)
+                j += 1
+            if depth:
+                return None
+            expr = text[i + 2:j - 1].strip()
+            i = j
+        else:
+            match = DART_IDENTIFIER.match(text, i + 1)
+            if not match:
+                return None
+            expr = match.group()
+            i = match.end()
+        
+        if not expr:
+            return None
+        if expr not in names:
+            name = placeholder_name(expr, len(args) + 1)
+            taken = {n for n, _ in args}
+            base, counter = name, 2
+            while name in taken:
+                name = f"{base}{counter}"
+                counter += 1
+            names[expr] = name
+            args.append((name, expr))
+        parts.append(f"{{{names[expr]}}}")
+    
+    return ''.join(parts), args
+
+def to_ui_message(text: str):
+    """
+    Validate a literal as UI text. Returns (message, args) or None; args is
+    empty for plain strings and lists (placeholder, expression) pairs for
+    interpolated ones.
+    """
+    # Plain literals go through the same parse so \' and \" are unescaped too
+    parsed = parse_interpolation(text.strip())
+    if not parsed:
+        return None
+    message, args = parsed
+    # The static text around the placeholders must look like UI text
+    if not is_valid_ui_string(ICU_PLACEHOLDER.sub(' ', message)):
+        return None
+    return message, args
+
+def byte_offsets(content: str, positions: list) -> dict:
+    """Map character positions in content to UTF-8 byte offsets."""
+    if content.isascii():
+        return {pos: pos for pos in positions}
+    
+    offsets = {}
+    last_pos = 0
+    last_byte = 0
+    for pos in sorted(set(positions)):
+        last_byte += len(content[last_pos:pos].encode('utf-8'))
+        last_pos = pos
+        offsets[pos] = last_byte
+    return offsets
+
+def extract_from_file(file_path: Path, stats: dict = None, occurrences: list = None) -> set:
+    """
+    Extract valid UI strings from a single Dart file.
+    Interpolated literals come back as ICU messages ('Streak: {count} days').
+    If occurrences is given, appends (byte offset, literal, text, args) for
+    each match, where literal is the quoted source text at that offset and
+    args the (placeholder, expression) pairs of an interpolated literal.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
             content = f.read()
     except Exception as e:
         print(f"⚠️  Error reading {file_path}: {e}")
         return set()
     
-    # Clean content
-    content = clean_content(content)
+    # Skip files with no trigger token before any regex work
+    if not RULES.extract.may_match(content):
+        if stats is not None:
+            stats["prefiltered"] = stats.get("prefiltered", 0) + 1
+        return set()
     
-    # Check each line for exclusions
-    lines = content.split('\n')
-    clean_lines = []
-    for line in lines:
-        if not EXCLUDE_LINE_REGEX.search(line):
-            clean_lines.append(line)
+    original = content
     
-    # Rejoin for multi-line matching
-    content = '\n'.join(clean_lines)
+    # Blank comments and excluded lines (same length, so positions still match the file)
+    content = RULES.clean_source(content)
     
     extracted = set()
+    found = {}  # literal start position -> (literal, message, args)
     
     # Try each pattern
-    for pattern_str in UI_TEXT_PATTERNS:
-        pattern = re.compile(pattern_str, re.DOTALL | re.MULTILINE)
-        matches = pattern.findall(content)
-        
-        for match in matches:
-            # Handle both single matches and tuples from groups
-            if isinstance(match, tuple):
-                for text in match:
-                    if text and is_valid_ui_string(text):
-                        extracted.add(text.strip())
-            else:
-                if match and is_valid_ui_string(match):
-                    extracted.add(match.strip())
+    for pattern in RULES.extract.patterns:
+        for match in pattern.finditer(content):
+            for group in range(1, (pattern.groups or 0) + 1):
+                text = match.group(group)
+                ui_message = to_ui_message(text) if text else None
+                if ui_message:
+                    message, args = ui_message
+                    extracted.add(message)
+                    start, end = match.start(group) - 1, match.end(group) + 1
+                    found[start] = (original[start:end], message, args)
+    
+    if occurrences is not None and found:
+        offsets = byte_offsets(original, list(found))
+        for start, (literal, message, args) in sorted(found.items()):
+            occurrences.append((offsets[start], literal, message, args))
     
     return extracted
 
-def scan_directory(app_lib: Path) -> dict:
-    """Scan directory and group strings by folder."""
+def scan_directory(app_lib: Path, manifest: list = None) -> dict:
+    """
+    Scan directory and group strings by folder.
+    If manifest is given, appends one entry per occurrence (see MANIFEST_FILE).
+    """
     grouped = {}
+    stats = {"files": 0, "prefiltered": 0}
     
     if not app_lib.exists():
         print(f"🚫 Directory not found: {app_lib}")
@@ -178,49 +257,138 @@ def scan_directory(app_lib: Path) -> dict:
         
         for file in files:
             # Skip non-Dart and generated files
-            if not file.endswith('.dart'):
-                continue
-            if file.endswith('.g.dart') or file.endswith('.freezed.dart'):
+            if not RULES.is_source_file(file):
                 continue
             
             file_path = Path(root) / file
-            file_strings = extract_from_file(file_path)
+            stats["files"] += 1
+            occurrences = [] if manifest is not None else None
+            file_strings = extract_from_file(file_path, stats, occurrences)
+            for offset, literal, text, args in occurrences or []:
+                entry = {
+                    "file": file_path.relative_to(app_lib).as_posix(),
+                    "offset": offset,
+                    "literal": literal,
+                    "text": text,
+                }
+                if args:
+                    entry["args"] = [expr for _, expr in args]
+                manifest.append(entry)
             if file_strings:
                 folder_strings.update(file_strings)
         
         if folder_strings:
             grouped[str(relative_folder)] = sorted(folder_strings)
     
+    print(f"⏭️  Prefilter skipped {stats['prefiltered']} of {stats['files']} files (no trigger token)")
     return grouped
 
-def save_output(grouped: dict, output_file: Path):
+def split_already_keyed(grouped: dict, known: dict) -> tuple:
+    """
+    Separate literals that already have an app_en.arb entry.
+    known maps normalised English value -> key (see arb_utils.value_index).
+    Returns (new strings grouped by folder, {literal: existing key}).
+    """
+    fresh = {}
+    keyed = {}
+    
+    for folder, strings in grouped.items():
+        remaining = []
+        for s in strings:
+            key = known.get(normalise_text(s))
+            if key:
+                keyed[s] = key
+            else:
+                remaining.append(s)
+        if remaining:
+            fresh[folder] = remaining
+    
+    return fresh, keyed
+
+def save_output(grouped: dict, output_file: Path, already_keyed: dict = None):
     """Save extracted strings to text file."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        total = 0
-        
-        for folder, strings in sorted(grouped.items()):
-            f.write(f"\n=== {folder} ===\n")
-            for s in strings:
-                f.write(f"- {s}\n")
-                total += 1
-        
-        # Add summary at the end
-        f.write(f"\n=== SUMMARY ===\n")
-        f.write(f"Total folders: {len(grouped)}\n")
-        f.write(f"Total strings: {total}\n")
+    lines = []
+    total = 0
+    
+    for folder, strings in sorted(grouped.items()):
+        lines.append(f"\n=== {folder} ===\n")
+        for s in strings:
+            lines.append(f"- {s}\n")
+            total += 1
+    
+    # Literals that already have a key ("* text → key", ignored by steps 2 and 3)
+    if already_keyed:
+        lines.append(f"\n=== ALREADY KEYED ===\n")
+        for s, key in sorted(already_keyed.items()):
+            lines.append(f"* {s} → {key}\n")
+    
+    # Add summary at the end
+    lines.append(f"\n=== SUMMARY ===\n")
+    lines.append(f"Total folders: {len(grouped)}\n")
+    lines.append(f"Total strings: {total}\n")
+    if already_keyed is not None:
+        lines.append(f"Already keyed: {len(already_keyed)}\n")
+    
+    # Plain file, not a link to a read-only object: it's edited by hand before step 2
+    if not write_artifact(output_file, "".join(lines), link=False):
+        print(f"♻️  {output_file.name} unchanged")
     
     print(f"✅ Extracted {total} UI strings from {len(grouped)} folders")
+    if already_keyed is not None:
+        print(f"🔑 {len(already_keyed)} strings already have a key in {EN_ARB.name}")
     print(f"📄 Output: {output_file}")
 
+def save_manifest(manifest: list, known: dict, output_file: Path, manifest_file: Path):
+    """
+    Attach keys to occurrences and save. Existing keys come from app_en.arb;
+    new ones are the keys step 2 will generate from output_file, including
+    its numeric suffixes for texts whose keys collide with each other or
+    with a different text already in app_en.arb.
+    """
+    arb_data, _, _ = generate_step.generate_arb(
+        generate_step.parse_unlocalized(output_file), verbose=False,
+        existing=generate_step.existing_messages(EN_ARB))
+    new_keys = {text: key for key, text in arb_data.items() if not key.startswith('@')}
+    
+    entries = []
+    for entry in manifest:
+        key = known.get(normalise_text(entry["text"])) or new_keys.get(entry["text"])
+        if key:
+            entries.append({**entry, "key": key})
+    
+    write_artifact(manifest_file, json.dumps(
+        {"root": str(APP_LIB), "occurrences": entries}, ensure_ascii=False, indent=2))
+    
+    print(f"🗺️  Manifest: {len(entries)} occurrences → {manifest_file}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Extract unlocalized UI strings.")
+    parser.add_argument("--delta", action="store_true",
+                        help="only emit strings that have no entry in app_en.arb yet")
+    args = parser.parse_args()
+    
     print("🔍 Scanning for unlocalized UI strings...")
     print(f"📁 App lib: {APP_LIB}")
     print(f"🚫 Excluding: {', '.join(EXCLUDE_DIRS)}\n")
     
-    grouped = scan_directory(APP_LIB)
+    already_keyed = None
+    known = {}
+    if args.delta:
+        if EN_ARB.exists():
+            known = value_index(load_arb(EN_ARB))
+            print(f"🔑 Delta mode: {len(known)} known values from {EN_ARB.name}")
+        else:
+            print(f"⚠️  {EN_ARB} not found — delta mode has nothing to filter")
+    
+    manifest = []
+    grouped = scan_directory(APP_LIB, manifest)
+    
+    if args.delta:
+        grouped, already_keyed = split_already_keyed(grouped, known)
     
-    if grouped:
-        save_output(grouped, OUTPUT_FILE)
+    if grouped or already_keyed:
+        save_output(grouped, OUTPUT_FILE, already_keyed)
+        save_manifest(manifest, known, OUTPUT_FILE, MANIFEST_FILE)
     else:
         print("⚠️  No UI strings found!")
 
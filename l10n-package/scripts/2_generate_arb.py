@@ -2,17 +2,38 @@
 """
 Step 2: Generate auto_extracted.arb from custom_unlocalized.txt
 Outputs: auto_extracted.arb (manually merge into app_en.arb)
+
+Usage:
+  python 2_generate_arb.py           # single auto_extracted.arb
+  python 2_generate_arb.py --shard   # also per-feature shards under output/shards/
+
+Shards only split the ARBs into per-feature files for review and
+translation; step 3 still emits context.l10n.<key>, so the app keeps
+using the single AppLocalizations class, not the per-shard classes.
 """
+import argparse
 import re
 import json
+import shutil
 from pathlib import Path
 
+from arb_utils import (
+    COMMON_SHARD, dump_arb, load_arb, locale_arb_files, normalise_text,
+    print_shard_report, shard_for_folder, shard_report,
+)
+from artifact_store import write_artifact
+
 # === Paths ===
 # === Paths ===
 ROOT = Path(__file__).resolve().parents[2]
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
 INPUT_FILE = OUTPUT_DIR / "custom_unlocalized.txt"
 OUTPUT_ARB = OUTPUT_DIR / "auto_extracted.arb"
+SHARDS_DIR = OUTPUT_DIR / "shards"
+EN_ARB = ROOT / "lib" / "l10n" / "app_en.arb"
+
+# {name} placeholders produced by step 1 for interpolated strings
+PLACEHOLDER_REGEX = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
 
 def make_key_from_text(text: str) -> str:
     """Generate valid camelCase Dart identifier from text."""
@@ -61,35 +82,161 @@ def parse_unlocalized(input_file: Path) -> list:
     
     return sorted(strings)
 
-def generate_arb(strings: list) -> dict:
-    """Generate ARB dictionary from strings."""
+def parse_grouped(input_file: Path) -> dict:
+    """Parse custom_unlocalized.txt keeping the per-folder grouping."""
+    grouped = {}
+    if not input_file.exists():
+        return grouped
+    
+    folder = None
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('=== ') and line.endswith(' ==='):
+                folder = line[4:-4].strip()
+                if folder == 'SUMMARY':
+                    folder = None
+                continue
+            if folder is not None and line.startswith('- '):
+                s = line[2:].strip()
+                if s:
+                    grouped.setdefault(folder, set()).add(s)
+    
+    return grouped
+
+def assign_shards(grouped: dict) -> dict:
+    """Map each text to a feature shard; text used by several features goes to common."""
+    text_shards = {}
+    for folder, strings in grouped.items():
+        shard = shard_for_folder(folder)
+        for text in strings:
+            text_shards.setdefault(text, set()).add(shard)
+    
+    return {
+        text: shards.pop() if len(shards) == 1 else COMMON_SHARD
+        for text, shards in text_shards.items()
+    }
+
+def collect_shards(shards_dir: Path) -> tuple:
+    """
+    Read the existing shards: ({key: shard}, {English key/@key: entry},
+    {locale: {key: value}} from every non-English shard ARB).
+    """
+    key_shards = {}
+    english = {}
+    translations = {}
+    if not shards_dir.exists():
+        return key_shards, english, translations
+    for shard_dir in sorted(p for p in shards_dir.iterdir() if p.is_dir()):
+        for locale, path in locale_arb_files(shard_dir).items():
+            data = {k: v for k, v in load_arb(path).items() if k != "@@locale"}
+            if locale == "en":
+                english.update(data)
+                key_shards.update((k, shard_dir.name) for k in data if not k.startswith('@'))
+            else:
+                entries = translations.setdefault(locale, {})
+                entries.update((k, v) for k, v in data.items() if not k.startswith('@'))
+    return key_shards, english, translations
+
+def save_shards(arb_data: dict, text_shards: dict, shards_dir: Path, en_arb: Path = EN_ARB):
+    """
+    Split the app's English messages into shards/<feature>/app_en.arb.
+    Shards cover all of app_en.arb plus this run's arb_data (or, before
+    app_en.arb exists, the previous shards plus arb_data), so keys that a
+    --delta run or step 3 no longer extracts keep their entries. The
+    shard set is rebuilt from scratch each run, so shards of removed
+    features disappear; a key goes to the shard of the folders using its
+    text this run, else to its previous shard, else to common, and merged
+    translations are carried over into whichever shard that is.
+    """
+    key_shards, previous, translations = collect_shards(shards_dir)
+    source = {k: v for k, v in load_arb(en_arb).items() if k != "@@locale"} if en_arb.exists() else previous
+    source = {**source, **arb_data}
+    if shards_dir.exists():
+        shutil.rmtree(shards_dir)
+    
+    shards = {}
+    for key, value in source.items():
+        if key.startswith('@'):
+            continue
+        shard = text_shards.get(value) or key_shards.get(key, COMMON_SHARD)
+        entries = shards.setdefault(shard, {"@@locale": "en"})
+        entries[key] = value
+        if f"@{key}" in source:
+            entries[f"@{key}"] = source[f"@{key}"]
+    
+    for shard, entries in sorted(shards.items()):
+        shard_dir = shards_dir / shard
+        write_artifact(shard_dir / "app_en.arb", json.dumps(entries, ensure_ascii=False, indent=2), link=False)
+        
+        for locale, values in sorted(translations.items()):
+            carried = {k: values[k] for k in entries if not k.startswith('@') and k in values}
+            if carried:
+                write_artifact(shard_dir / f"app_{locale}.arb", dump_arb({"@@locale": locale, **carried}),
+                               link=False)
+        
+        # gen-l10n config so each shard can be checked on its own. Nothing in
+        # the app imports the generated class (see the module docstring), and
+        # use-deferred-loading would only matter on web if something did.
+        class_name = "".join(p.capitalize() for p in re.split(r'[^a-zA-Z0-9]+', shard) if p)
+        write_artifact(shard_dir / "l10n.yaml", (
+            f"arb-dir: {shard_dir.relative_to(ROOT).as_posix()}\n"
+            "template-arb-file: app_en.arb\n"
+            f"output-localization-file: {shard}_localizations.dart\n"
+            f"output-class: {class_name}Localizations\n"
+            "use-deferred-loading: true\n"
+        ))
+    
+    print(f"\n🧩 Wrote {len(shards)} shard(s) to {shards_dir}")
+
+def existing_messages(en_arb: Path = EN_ARB) -> dict:
+    """{key: value} already in app_en.arb ({} if it doesn't exist yet)."""
+    if not en_arb.exists():
+        return {}
+    return {k: v for k, v in load_arb(en_arb).items() if not k.startswith('@') and isinstance(v, str)}
+
+def generate_arb(strings: list, verbose: bool = True, existing: dict = None) -> dict:
+    """
+    Generate ARB dictionary from strings.
+    existing holds app_en.arb's messages: a generated key that already
+    names a different text there gets a numeric suffix like any other
+    collision, so merging the output never overwrites a key.
+    """
     arb_data = {}
     skipped = []
     duplicates = {}
+    existing = existing or {}
+    
+    def is_taken(key: str, text: str) -> bool:
+        if key in arb_data:
+            return True
+        return key in existing and normalise_text(existing[key]) != normalise_text(text)
     
     for text in strings:
         key = make_key_from_text(text)
         
         if not key:
             skipped.append(text)
-            print(f"⚠️  Invalid key for: '{text}'")
+            if verbose:
+                print(f"⚠️  Invalid key for: '{text}'")
             continue
         
         # Handle duplicate keys
-        if key in arb_data:
+        if is_taken(key, text):
             if key not in duplicates:
-                duplicates[key] = [arb_data[key], text]
+                duplicates[key] = [arb_data.get(key, existing.get(key)), text]
             else:
                 duplicates[key].append(text)
             
             # Create unique key by appending number
             counter = 2
             new_key = f"{key}{counter}"
-            while new_key in arb_data:
+            while is_taken(new_key, text):
                 counter += 1
                 new_key = f"{key}{counter}"
             key = new_key
-            print(f"⚠️  Duplicate key, using: {key}")
+            if verbose:
+                print(f"⚠️  Duplicate key, using: {key}")
         
         # Add to ARB
         arb_data[key] = text
@@ -97,7 +244,16 @@ def generate_arb(strings: list) -> dict:
             "description": f"Auto-extracted: {text[:60]}"
         }
         
-        print(f"✅ {key} = '{text}'")
+        # ICU placeholders from interpolated strings, in order of first use
+        # (gen-l10n passes them as method arguments in this order)
+        placeholders = list(dict.fromkeys(PLACEHOLDER_REGEX.findall(text)))
+        if placeholders:
+            arb_data[f"@{key}"]["placeholders"] = {
+                name: {"type": "Object"} for name in placeholders
+            }
+        
+        if verbose:
+            print(f"✅ {key} = '{text}'")
     
     return arb_data, skipped, duplicates
 
@@ -115,13 +271,19 @@ def save_arb(arb_data: dict, output_file: Path):
         if meta_key in metadata:
             sorted_data[meta_key] = metadata[meta_key]
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(sorted_data, f, ensure_ascii=False, indent=2)
+    if not write_artifact(output_file, json.dumps(sorted_data, ensure_ascii=False, indent=2)):
+        print(f"\n♻️  {output_file.name} unchanged")
     
     print(f"\n✅ Generated ARB with {len(regular)} entries")
     print(f"📄 Output: {output_file}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate ARB entries from extracted strings.")
+    parser.add_argument("--shard", action="store_true",
+                        help="also emit per-feature ARB shards plus a shared common shard "
+                             "(files for review/translation; the app still uses AppLocalizations)")
+    args = parser.parse_args()
+    
     print("🔧 Generating ARB file from extracted strings...\n")
     
     strings = parse_unlocalized(INPUT_FILE)
@@ -132,11 +294,16 @@ def main():
     
     print(f"📋 Processing {len(strings)} unique strings...\n")
     
-    arb_data, skipped, duplicates = generate_arb(strings)
+    arb_data, skipped, duplicates = generate_arb(strings, existing=existing_messages())
     
     if arb_data:
         save_arb(arb_data, OUTPUT_ARB)
         
+        if args.shard:
+            text_shards = assign_shards(parse_grouped(INPUT_FILE))
+            save_shards(arb_data, text_shards, SHARDS_DIR)
+            print_shard_report(shard_report(SHARDS_DIR))
+        
         if skipped:
             print(f"\n⚠️  Skipped {len(skipped)} strings with invalid keys")
         
@@ -2,7 +2,13 @@
 """
 Step 3: Replace hardcoded strings in Dart files with l10n references
 Run AFTER flutter gen-l10n succeeds
+
+Usage:
+  python 3_replace_incode.py              # search all of lib/ for every string
+  python 3_replace_incode.py --manifest   # patch only the occurrences listed by step 1
 """
+import argparse
+import json
 import os
 import re
 from pathlib import Path
@@ -12,6 +18,7 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[2]
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
 INPUT_FILE = OUTPUT_DIR / "custom_unlocalized.txt"
+MANIFEST_FILE = OUTPUT_DIR / "extraction_manifest.json"
 APP_LIB = ROOT / "lib"
 
 # === Exclusions ===
@@ -145,9 +152,244 @@ def process_directory(app_lib: Path, string_map: dict):
     
     return modified_files
 
+def load_manifest(manifest_file: Path) -> dict:
+    """Load step 1's occurrence manifest grouped by file."""
+    if not manifest_file.exists():
+        print(f"🚫 Manifest not found: {manifest_file}")
+        return {}
+    
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    by_file = {}
+    for entry in data.get("occurrences", []):
+        by_file.setdefault(entry["file"], {})[entry["offset"]] = entry
+    return by_file
+
+# === Const contexts ===
+# `const` right before an opener: const Text(, const EdgeInsets.all(, const [, const <T>{
+CONST_BEFORE_OPENER = re.compile(rb'\bconst\b\s*(?:[A-Za-z_$][\w$.]*\s*)?(?:<[^;{}()]*>\s*)?$')
+# `const name = ...` / `static const name = ...` — a constant that can't use context
+CONST_DECLARATION = re.compile(rb'\bconst\b[^;=]*=(?!=)')
+# `{` after one of these opens a map/set literal rather than a block
+LITERAL_BRACE_AFTER = re.compile(rb'(?:[(,:\[=?>]|\breturn|\bconst|\byield)\s*$')
+CONST_LOOKBEHIND = 160  # bytes searched before an opener
+# 'a' 'b' is one string in Dart; replacing only the first part would break it
+ADJACENT_STRING = re.compile(rb'\s*[rR]?[\'"]')
+
+def _scan_string(data: bytes, i: int, quote: bytes, raw: bool) -> tuple:
+    """Skip string content from i; returns (index after the string or `${`, hit `${`)."""
+    while i < len(data):
+        if data.startswith(quote, i):
+            return i + len(quote), False
+        if not raw and data[i:i + 1] == b'\\':
+            i += 2
+            continue
+        if not raw and data.startswith(b'${', i):
+            return i + 2, True
+        if len(quote) == 1 and data[i:i + 1] == b'\n':
+            return i + 1, False  # unterminated: stop at end of line
+        i += 1
+    return i, False
+
+def _const_context(data: bytes, stack: list, top_stmt_start: int, pos: int):
+    """
+    Walk the openers enclosing the literal at pos outward to the enclosing
+    block. Returns [(start, end)] spans of `const` keywords to drop, or None
+    if the literal sits in a const declaration (no context there).
+    """
+    drops = []
+    child = pos
+    for opener, opener_pos, stmt_start, _ in reversed(stack):
+        if opener == b'${':
+            break
+        if opener == b'{' and not LITERAL_BRACE_AFTER.search(data[max(0, opener_pos - 16):opener_pos]):
+            break  # block or class body: the statement starts at stmt_start
+        window_start = max(0, opener_pos - CONST_LOOKBEHIND)
+        match = CONST_BEFORE_OPENER.search(data[window_start:opener_pos])
+        if match:
+            start = window_start + match.start()
+            end = start + len(b'const')
+            while data[end:end + 1].isspace():
+                end += 1
+            drops.append((start, end))
+        child = opener_pos
+    else:
+        stmt_start = top_stmt_start
+    
+    if CONST_DECLARATION.search(data[stmt_start:child]):
+        return None
+    return drops
+
+def const_contexts(data: bytes, offsets: set) -> dict:
+    """
+    Single forward pass over a Dart file (skipping comments and strings)
+    that resolves every string token starting at an offset in offsets.
+    Returns {offset: (end of the token, _const_context result)}; the end
+    includes any ${...} interpolations and the closing quote.
+    All syntax bytes are ASCII, so scanning UTF-8 bytes is safe.
+    """
+    contexts = {}
+    ends = {}
+    stack = []       # [opener, position, statement start, string to resume]
+    stmt_start = 0   # statement start at the top level
+    i = 0
+    n = len(data)
+    
+    while i < n:
+        c = data[i:i + 1]
+        if data.startswith(b'//', i):
+            i = data.find(b'\n', i)
+            if i == -1:
+                break
+            continue
+        if data.startswith(b'/*', i):
+            end = data.find(b'*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        
+        if c in b'\'"':
+            token = i
+            if i in offsets:
+                contexts[i] = _const_context(data, stack, stmt_start, i)
+            raw = i > 0 and data[i - 1:i] in (b'r', b'R')
+            quote = data[i:i + 3] if data[i:i + 3] in (b"'''", b'"""') else c
+            i, interpolated = _scan_string(data, i + len(quote), quote, raw)
+            if interpolated:
+                stack.append([b'${', i - 2, i, (quote, raw, token)])
+            else:
+                ends[token] = i
+            continue
+        
+        if c in b'([{':
+            stack.append([c, i, i + 1, None])
+        elif c in b')]}' and stack:
+            opener, _, _, resume = stack.pop()
+            if opener == b'${':
+                quote, raw, token = resume
+                i, interpolated = _scan_string(data, i + 1, quote, raw)
+                if interpolated:
+                    stack.append([b'${', i - 2, i, resume])
+                else:
+                    ends[token] = i
+                continue
+            if c == b'}':
+                if stack:
+                    stack[-1][2] = i + 1
+                else:
+                    stmt_start = i + 1
+        elif c == b';':
+            if stack:
+                stack[-1][2] = i + 1
+            else:
+                stmt_start = i + 1
+        i += 1
+    
+    return {pos: (ends.get(pos), context) for pos, context in contexts.items()}
+
+def patch_file(file_path: Path, occurrences: list) -> tuple:
+    """
+    Patch verified occurrences in one file. `const` keywords whose
+    expression encloses a patched literal are dropped, since
+    context.l10n.* is not a constant. All edits are applied last offset
+    first so earlier offsets stay valid.
+    Returns (applied, rejected [(entry, reason)], dropped const count).
+    """
+    data = file_path.read_bytes()
+    contexts = const_contexts(data, {e["offset"] for e in occurrences})
+    applied = []
+    rejected = []
+    edits = {}  # start -> (end, replacement)
+    limit = len(data)
+    
+    for entry in sorted(occurrences, key=lambda e: e["offset"], reverse=True):
+        literal = entry["literal"].encode('utf-8')
+        start = entry["offset"]
+        end = start + len(literal)
+        
+        # File edited since extraction (or overlapping entry): don't guess
+        if end > limit or data[start:end] != literal:
+            rejected.append((entry, "stale offset"))
+            continue
+        if start not in contexts:
+            rejected.append((entry, "not a string literal"))
+            continue
+        token_end, drops = contexts[start]
+        if token_end != end or ADJACENT_STRING.match(data, end):
+            # Step 1 stopped at an inner quote, or the string goes on: don't cut it
+            rejected.append((entry, "not the whole string"))
+            continue
+        if drops is None:
+            rejected.append((entry, "in a const declaration"))
+            continue
+        
+        reference = f"context.l10n.{entry['key']}"
+        if entry.get("args"):
+            # Interpolated literal: ICU message method taking the original expressions
+            reference += f"({', '.join(entry['args'])})"
+        edits[start] = (end, reference.encode('utf-8'))
+        for drop_start, drop_end in drops:
+            edits[drop_start] = (drop_end, b'')
+        applied.append(entry)
+        limit = start
+    
+    dropped = sum(1 for _, replacement in edits.values() if not replacement)
+    for start in sorted(edits, reverse=True):
+        end, replacement = edits[start]
+        data = data[:start] + replacement + data[end:]
+    
+    if applied:
+        file_path.write_bytes(data)
+    return applied, rejected, dropped
+
+def process_manifest(app_lib: Path, manifest: dict):
+    """Open only the files listed in the manifest and patch their occurrences."""
+    modified_files = []
+    rejected = []
+    dropped = 0
+    
+    for relative_path, entries in sorted(manifest.items()):
+        file_path = app_lib / relative_path
+        if not file_path.exists():
+            rejected.extend((entry, "file missing") for entry in entries.values())
+            print(f"⚠️  Missing file: {relative_path}")
+            continue
+        
+        applied, skipped, file_dropped = patch_file(file_path, list(entries.values()))
+        rejected.extend(skipped)
+        dropped += file_dropped
+        if applied:
+            modified_files.append(relative_path)
+            print(f"✏️  Modified: {relative_path} ({len(applied)} replacement(s))")
+        for entry, reason in skipped:
+            print(f"⚠️  Rejected {reason} at {entry['offset']} in {relative_path}: {entry['literal']}")
+    
+    return modified_files, rejected, dropped
+
 def main():
+    parser = argparse.ArgumentParser(description="Replace hardcoded strings with l10n references.")
+    parser.add_argument("--manifest", nargs="?", const=str(MANIFEST_FILE), default=None,
+                        help="patch only occurrences from step 1's extraction manifest")
+    args = parser.parse_args()
+    
     print("🔄 Replacing hardcoded strings with l10n references...\n")
     
+    if args.manifest:
+        manifest = load_manifest(Path(args.manifest))
+        if not manifest:
+            print("⚠️  No occurrences to replace!")
+            return
+        
+        total = sum(len(entries) for entries in manifest.values())
+        print(f"🗺️  {total} occurrences in {len(manifest)} file(s)\n")
+        modified, rejected, dropped = process_manifest(APP_LIB, manifest)
+        print(f"\n✅ Modified {len(modified)} file(s), {total - len(rejected)} replacement(s)")
+        if dropped:
+            print(f"🧱 Dropped {dropped} enclosing `const` keyword(s) (l10n lookups aren't constant)")
+        if rejected:
+            print(f"⚠️  Rejected {len(rejected)} occurrence(s) — re-run step 1 and try again")
+        return
+    
     string_map = parse_strings(INPUT_FILE)
     
     if not string_map:
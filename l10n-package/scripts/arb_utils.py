@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for reading and writing ARB files.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from artifact_store import atomic_write
+
+ARB_PREFIX = "app_"
+COMMON_SHARD = "common"
+
+# Sidecar next to the ARBs: {lang: {key: hash of the English text it was translated from}}
+SOURCE_MANIFEST = "translation_sources.json"
+
+
+def load_arb(file_path: Path) -> dict:
+    """Load an ARB file, preserving key order."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_arb(arb_data: dict) -> str:
+    """Serialise ARB data the same way the pipeline writes it."""
+    return json.dumps(arb_data, ensure_ascii=False, indent=2) + "\n"
+
+
+def save_arb(file_path: Path, arb_data: dict):
+    """Write ARB data back to disk."""
+    atomic_write(file_path, dump_arb(arb_data))
+
+
+def message_keys(arb_data: dict) -> set:
+    """Return the message keys of an ARB (no @metadata, no @@locale)."""
+    return {k for k in arb_data if not k.startswith("@")}
+
+
+def locale_arb_files(l10n_dir: Path) -> dict:
+    """Map locale code -> ARB path for every app_<locale>.arb in l10n_dir."""
+    files = {}
+    if not l10n_dir.exists():
+        return files
+    for path in sorted(l10n_dir.glob(f"{ARB_PREFIX}*.arb")):
+        locale = path.stem[len(ARB_PREFIX):]
+        if locale:
+            files[locale] = path
+    return files
+
+
+def normalise_text(text: str) -> str:
+    """
+    Canonical form of a UI string (NFC, collapsed whitespace). The one
+    definition of "same text" for delta extraction, the analysis server
+    and duplicate consolidation.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def value_index(arb_data: dict) -> dict:
+    """Map normalised message value -> first key that has it."""
+    index = {}
+    for key in arb_data:
+        value = arb_data[key]
+        if not key.startswith("@") and isinstance(value, str):
+            index.setdefault(normalise_text(value), key)
+    return index
+
+
+def remove_keys(arb_data: dict, keys: set) -> dict:
+    """Return a copy of arb_data without the given keys and their @metadata."""
+    return {
+        k: v for k, v in arb_data.items()
+        if k not in keys and not (k.startswith("@") and k[1:] in keys)
+    }
+
+
+def source_hash(text: str) -> str:
+    """Stable short hash of an English source string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_source_manifest(l10n_dir: Path) -> dict:
+    """Load the translation source-hash manifest ({} if absent)."""
+    path = Path(l10n_dir) / SOURCE_MANIFEST
+    if not path.is_file():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_source_manifest(l10n_dir: Path, manifest: dict):
+    """Write the manifest with stable key order so diffs stay small."""
+    ordered = {lang: dict(sorted(hashes.items())) for lang, hashes in sorted(manifest.items())}
+    atomic_write(Path(l10n_dir) / SOURCE_MANIFEST, json.dumps(ordered, ensure_ascii=False, indent=2))
+
+
+def shard_for_folder(folder: str) -> str:
+    """Map an extraction folder (features/habits/widgets) to its shard name."""
+    parts = Path(folder).parts
+    if len(parts) >= 2 and parts[0] == "features":
+        return parts[1]
+    return COMMON_SHARD
+
+
+def shard_report(shards_dir: Path) -> dict:
+    """Return {shard: {locale: {"entries": n, "bytes": n}}} for a shards dir."""
+    report = {}
+    if not shards_dir.exists():
+        return report
+    for shard_dir in sorted(p for p in shards_dir.iterdir() if p.is_dir()):
+        sizes = {}
+        for locale, path in locale_arb_files(shard_dir).items():
+            sizes[locale] = {
+                "entries": len(message_keys(load_arb(path))),
+                "bytes": path.stat().st_size,
+            }
+        if sizes:
+            report[shard_dir.name] = sizes
+    return report
+
+
+def print_shard_report(report: dict):
+    """Print shard sizes per locale as a table."""
+    locales = sorted({loc for sizes in report.values() for loc in sizes})
+    print(f"\n📊 Shard sizes (entries / bytes)")
+    print("   " + f"{'shard':<16}" + "".join(f"{loc:>18}" for loc in locales))
+    for shard, sizes in sorted(report.items()):
+        cells = []
+        for loc in locales:
+            size = sizes.get(loc)
+            cells.append(f"{size['entries']:>7} / {size['bytes']:>8}" if size else f"{'-':>18}")
+        print("   " + f"{shard:<16}" + "".join(f"{c:>18}" for c in cells))
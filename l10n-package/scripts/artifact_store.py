@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Concurrency-safe artifact writes for the output directories.
+Artifacts are stored by content hash under <dir>/.objects/ and the stable
+name (custom_unlocalized.txt, auto_extracted.arb, ...) becomes a symlink to
+the current object (a plain atomic copy where symlinks aren't available).
+Writes happen under an advisory lock on <dir>/.lock, and a write whose
+content is identical to what the name already points at is skipped, so
+mtimes only change when the content does.
+
+Objects are read-only (0444) and shared by every name with the same
+content, so a symlinked name must not be edited in place. Files meant to
+be edited by hand between steps (custom_unlocalized.txt,
+missing_translations_<lang>.arb, shard ARBs) are written with
+link=False: a plain atomic copy with no object behind it.
+
+Usage:
+  python artifact_store.py --prune [DIR]   # drop objects no name points at
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# === Paths ===
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OBJECTS_DIRNAME = ".objects"
+LOCK_FILENAME = ".lock"
+
+
+@contextmanager
+def locked(directory: Path):
+    """Hold an exclusive advisory lock on directory/.lock."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_FILENAME, "a+b") as lock:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _default_mode() -> int:
+    """0o666 minus the process umask: the mode open(path, "w") would use."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _replace_atomically(path: Path, data: bytes):
+    """
+    Write data to a temp file next to path, then rename it into place.
+    mkstemp creates files as 0600, so the temp file first gets the mode of
+    the file it replaces (or the umask default for a new file).
+    """
+    if os.path.isfile(path) and not os.path.islink(path):
+        mode = os.stat(path).st_mode & 0o7777
+    else:
+        mode = _default_mode()  # new file, or a name that pointed at a read-only object
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def atomic_write(path: Path, content) -> None:
+    """
+    Replace path atomically, without content addressing or a lock file.
+    Used for files outside the output dirs (ARBs, caches) where readers only
+    need to never see a half-written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    _replace_atomically(path, data)
+
+
+def write_artifact(path: Path, content, link: bool = True) -> bool:
+    """
+    Store content by hash and point path at it. With link=False (files
+    edited by hand) path becomes a plain, writable atomic copy instead.
+    Returns False (and touches nothing) if path already has this content.
+    """
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    digest = hashlib.sha256(data).hexdigest()
+    directory = path.parent
+
+    with locked(directory):
+        unchanged = path.is_file() and hashlib.sha256(path.read_bytes()).hexdigest() == digest
+        if not link:
+            if not unchanged or path.is_symlink():
+                _replace_atomically(path, data)  # also replaces an older symlink
+            return not unchanged
+        if unchanged:
+            return False
+
+        obj = directory / OBJECTS_DIRNAME / digest[:2] / digest
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            _replace_atomically(obj, data)
+            os.chmod(obj, 0o444)  # objects are immutable
+
+        link_tmp = directory / f".{path.name}.{os.getpid()}.link"
+        try:
+            if link_tmp.is_symlink() or link_tmp.exists():
+                link_tmp.unlink()
+            os.symlink(os.path.relpath(obj, directory), link_tmp)
+            os.replace(link_tmp, path)
+        except (OSError, NotImplementedError):
+            # No symlink support (e.g. Windows without privileges): atomic copy
+            if link_tmp.is_symlink():
+                link_tmp.unlink()
+            _replace_atomically(path, data)
+    return True
+
+
+def prune_objects(directory: Path = OUTPUT_DIR) -> int:
+    """Delete objects under directory that no symlink in directory points at."""
+    removed = 0
+    objects_dirs = list(Path(directory).rglob(OBJECTS_DIRNAME))
+
+    for objects_dir in objects_dirs:
+        parent = objects_dir.parent
+        with locked(parent):
+            live = {
+                (parent / os.readlink(p)).resolve()
+                for p in parent.iterdir() if p.is_symlink()
+            }
+            for obj in objects_dir.rglob("*"):
+                if obj.is_file() and obj.resolve() not in live:
+                    os.chmod(obj, 0o644)
+                    obj.unlink()
+                    removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed output store.")
+    parser.add_argument("--prune", action="store_true", help="remove unreferenced objects")
+    parser.add_argument("directory", nargs="?", default=str(OUTPUT_DIR))
+    args = parser.parse_args()
+
+    if not args.prune:
+        parser.print_help()
+        sys.exit(1)
+
+    removed = prune_objects(Path(args.directory))
+    print(f"🧹 Removed {removed} unreferenced object(s) from {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Consolidate ARB keys that share the same English value.
+Groups app_en.arb keys by their normalised English text, picks one canonical
+key per group and (with --apply) rewrites every alias reference in lib/ and
+removes the aliases from all locale ARBs.
+Outputs: duplicate_keys_report.json
+
+Usage:
+  python consolidate_duplicate_keys.py           # analysis only
+  python consolidate_duplicate_keys.py --apply   # rewrite code and ARBs
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from arb_utils import load_arb, locale_arb_files, message_keys, normalise_text, remove_keys, save_arb
+from artifact_store import atomic_write, write_artifact
+from detect_unused_keys import L10N_REF_PATTERN, iter_dart_files, scan_references
+
+# === Paths ===
+ROOT = Path(__file__).resolve().parents[2]
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+APP_LIB = ROOT / "lib"
+L10N_DIR = APP_LIB / "l10n"
+TEMPLATE_LOCALE = "en"
+REPORT_FILE = OUTPUT_DIR / "duplicate_keys_report.json"
+
+
+def group_duplicates(en_data: dict) -> list:
+    """Return lists of keys whose English values are identical after normalising."""
+    groups = {}
+    for key in message_keys(en_data):
+        value = en_data[key]
+        if not isinstance(value, str):
+            continue
+        digest = hashlib.sha1(normalise_text(value).encode("utf-8")).hexdigest()
+        groups.setdefault(digest, []).append(key)
+    return [sorted(keys) for keys in groups.values() if len(keys) > 1]
+
+
+def pick_canonical(keys: list, references) -> str:
+    """Most referenced key wins, then the shortest, then alphabetical."""
+    return min(keys, key=lambda k: (-references.get(k, 0), len(k), k))
+
+
+def build_alias_map(groups: list, references) -> dict:
+    """Map every alias key to its canonical key."""
+    aliases = {}
+    for keys in groups:
+        canonical = pick_canonical(keys, references)
+        for key in keys:
+            if key != canonical:
+                aliases[key] = canonical
+    return aliases
+
+
+def entry_bytes(arb_data: dict, key: str) -> int:
+    """Approximate on-disk size of a key and its @metadata."""
+    size = 0
+    for k in (key, f"@{key}"):
+        if k in arb_data:
+            size += len(json.dumps({k: arb_data[k]}, ensure_ascii=False).encode("utf-8"))
+    return size
+
+
+def measure_savings(aliases: dict, arb_files: dict) -> dict:
+    """
+    Bytes per locale and translated entries (alias x non-English locale)
+    saved by dropping the aliases. These are entries to translate and
+    review, not translator calls: the translation queue already sends an
+    identical English text once, and calls are batched.
+    """
+    bytes_saved = {}
+    translated_entries = 0
+    for locale, path in arb_files.items():
+        data = load_arb(path)
+        bytes_saved[locale] = sum(entry_bytes(data, alias) for alias in aliases)
+        if locale != TEMPLATE_LOCALE:
+            translated_entries += len(aliases)
+    return {"bytes": bytes_saved, "translated_entries": translated_entries}
+
+
+def rewrite_references(app_lib: Path, aliases: dict) -> dict:
+    """
+    Rewrite alias references to canonical keys in one pass over lib/.
+    Files are read and written with newline='' (CRLF files stay CRLF) and
+    replaced atomically.
+    """
+    rewritten = {}
+    hits = [0]
+
+    def substitute(match):
+        group = 1 if match.group(1) else 2
+        key = match.group(group)
+        if key not in aliases:
+            return match.group(0)
+        hits[0] += 1
+        start = match.start(group) - match.start()
+        end = match.end(group) - match.start()
+        return match.group(0)[:start] + aliases[key] + match.group(0)[end:]
+
+    for file_path in iter_dart_files(app_lib):
+        try:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"⚠️  Error reading {file_path}: {e}")
+            continue
+
+        hits[0] = 0
+        new_content = L10N_REF_PATTERN.sub(substitute, content)
+        if hits[0]:
+            atomic_write(file_path, new_content)
+            relative_path = str(file_path.relative_to(app_lib))
+            rewritten[relative_path] = hits[0]
+            print(f"✏️  Modified: {relative_path}")
+
+    return rewritten
+
+
+def consolidate_arbs(aliases: dict, arb_files: dict):
+    """Drop aliases from every locale ARB, keeping a translation the canonical lacks."""
+    for locale, path in arb_files.items():
+        data = load_arb(path)
+        present = message_keys(data) & aliases.keys()
+        if not present:
+            continue
+
+        for alias in sorted(present):
+            canonical = aliases[alias]
+            if canonical not in data:
+                data[canonical] = data[alias]
+
+        save_arb(path, remove_keys(data, present))
+        print(f"✂️  {path.name}: removed {len(present)} alias keys")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consolidate ARB keys with identical English values.")
+    parser.add_argument("--apply", action="store_true",
+                        help="rewrite lib/ references and remove aliases from all locale ARBs")
+    args = parser.parse_args()
+
+    arb_files = locale_arb_files(L10N_DIR)
+    if TEMPLATE_LOCALE not in arb_files:
+        print(f"🚫 English ARB not found: {L10N_DIR / 'app_en.arb'}")
+        return
+
+    print("🔍 Looking for duplicate English values...\n")
+
+    en_data = load_arb(arb_files[TEMPLATE_LOCALE])
+    groups = group_duplicates(en_data)
+    if not groups:
+        print("✅ No duplicate values found")
+        return
+
+    references = scan_references(APP_LIB)
+    aliases = build_alias_map(groups, references)
+    savings = measure_savings(aliases, arb_files)
+
+    report = {
+        "groups": [
+            {
+                "value": en_data[keys[0]],
+                "canonical": pick_canonical(keys, references),
+                "aliases": [k for k in keys if k in aliases],
+            }
+            for keys in sorted(groups)
+        ],
+        "savings": savings,
+    }
+    write_artifact(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    for group in report["groups"]:
+        print(f"🔗 {group['canonical']} ← {', '.join(group['aliases'])}  ('{group['value'][:40]}')")
+    print(f"\n📋 {len(groups)} duplicate groups, {len(aliases)} alias keys")
+    print("💾 Bytes saved: " + ", ".join(f"{loc}={n}" for loc, n in savings["bytes"].items()))
+    print(f"🌍 Translated entries saved: {savings['translated_entries']} (alias × non-English locale)")
+    print(f"📄 Output: {REPORT_FILE}")
+
+    if args.apply:
+        print("\n🔄 Rewriting references...")
+        rewritten = rewrite_references(APP_LIB, aliases)
+        consolidate_arbs(aliases, arb_files)
+        print(f"\n✅ Rewrote {sum(rewritten.values())} references in {len(rewritten)} file(s)")
+        print("📌 Next step: Run flutter gen-l10n")
+    else:
+        print("\nℹ️  Dry run — pass --apply to rewrite code and ARBs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,50 @@
 #!/usr/bin/env python3
+"""
+Flag translations that are identical to the English text (left untranslated).
+Outputs (per app): output/<app>/bad_translations_report.json
+"""
 import json
-import os
-from pathlib import Path
 
-# Paths
-ROOT = Path(__file__).resolve().parents[3]
-L10N_DIR = ROOT / "cng_customer" / "lib" / "l10n"
-OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+from arb_utils import load_arb
+from artifact_store import write_artifact
+from l10n_config import load_apps
 
-EN_FILE = L10N_DIR / "app_en.arb"
-LANG_FILES = {
-    "ar": L10N_DIR / "app_ar.arb",
-    "bn": L10N_DIR / "app_bn.arb",
-}
-
-def load_arb(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def main():
-    en_data = load_arb(EN_FILE)
+def find_bad_translations(app):
+    """{locale: [keys whose value equals the template's]} for an app."""
+    en_data = load_arb(app.arb_path(app.template_locale))
     en_texts = {k: v for k, v in en_data.items() if not k.startswith("@")}
     bad_translations = {}
 
-    for lang, path in LANG_FILES.items():
+    for lang in app.target_locales:
+        path = app.arb_path(lang)
+        if not path.is_file():
+            continue
         lang_data = load_arb(path)
         bad_keys = []
         for k, v in lang_data.items():
             if k.startswith("@"):
                 continue
-            if k in en_texts and en_texts[k].strip() == v.strip():
+            if k in en_texts and isinstance(v, str) and en_texts[k].strip() == v.strip():
                 bad_keys.append(k)
         bad_translations[lang] = bad_keys
+    return bad_translations
+
+def main():
+    for app in load_apps():
+        if not app.arb_path(app.template_locale).is_file():
+            print(f"🚫 {app.name}: template ARB not found ({app.arb_path(app.template_locale)})")
+            continue
+
+        bad_translations = find_bad_translations(app)
 
-    # Write output
-    output_path = OUTPUT_DIR / "bad_translations_report.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(bad_translations, f, ensure_ascii=False, indent=2)
+        # Write output
+        output_path = app.output_dir / "bad_translations_report.json"
+        write_artifact(output_path, json.dumps(bad_translations, ensure_ascii=False, indent=2))
+        for lang, keys in bad_translations.items():
+            print(f"⚠️ {app.name} {lang}: {len(keys)} untranslated")
+        print(f"📄 Output: {output_path}")
 
-    print("⚠️ Bad translation detection complete. Output saved to /output.")
+    print("⚠️ Bad translation detection complete.")
 
 if __name__ == "__main__":
     main()
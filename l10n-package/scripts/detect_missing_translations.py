@@ -1,53 +1,110 @@
 #!/usr/bin/env python3
+"""
+Audit each app's locale ARBs (l10n_apps.json) against its template ARB.
+Reports keys that are missing and keys whose English text changed since
+they were translated (stale), using the source hashes recorded in
+translation_sources.json. Both go into missing_strings_report.json so the
+translate step only re-sends what actually changed.
+Outputs (per app): output/<app>/missing_strings_report.json
+                   output/<app>/stale_strings_report.json
+                   output/<app>/missing_summary.txt
+"""
 import json
-import os
-from pathlib import Path
 
-# Paths
-ROOT = Path(__file__).resolve().parents[3]  # go up to project root
-L10N_DIR = ROOT / "cng_customer" / "lib" / "l10n"
-OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+from arb_utils import load_arb, load_source_manifest, message_keys, save_source_manifest, source_hash
+from artifact_store import write_artifact
+from l10n_config import load_apps
 
-EN_FILE = L10N_DIR / "app_en.arb"
-LANG_FILES = {
-    "ar": L10N_DIR / "app_ar.arb",
-    "bn": L10N_DIR / "app_bn.arb",
-}
 
-def load_arb(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def audit_app(app, record_baseline=True):
+    """
+    Returns ({locale: missing keys}, {locale: stale keys}) for an app's
+    non-template locales, or None if it has no template ARB.
+    Translated keys with no recorded hash are assumed current and, with
+    record_baseline, their hashes are saved to translation_sources.json.
+    """
+    template = app.arb_path(app.template_locale)
+    if not template.is_file():
+        return None
 
-def main():
-    en_data = load_arb(EN_FILE)
-    en_keys = {k for k in en_data.keys() if not k.startswith("@")}
+    en_data = load_arb(template)
+    en_keys = message_keys(en_data)
+    en_hashes = {k: source_hash(en_data[k]) for k in en_keys if isinstance(en_data[k], str)}
+    manifest = load_source_manifest(app.l10n_dir)
     missing = {}
+    stale = {}
+    baselined = 0
+
+    for lang in app.target_locales:
+        path = app.arb_path(lang)
+        lang_keys = message_keys(load_arb(path)) if path.is_file() else set()
+        missing[lang] = sorted(en_keys - lang_keys)
+
+        # Translated keys whose English source changed since translation
+        hashes = manifest.setdefault(lang, {})
+        stale_keys = []
+        for k in sorted((en_keys & lang_keys) & en_hashes.keys()):
+            recorded = hashes.get(k)
+            if recorded is None:
+                # No record yet: assume the current translation matches
+                hashes[k] = en_hashes[k]
+                baselined += 1
+            elif recorded != en_hashes[k]:
+                stale_keys.append(k)
+        stale[lang] = stale_keys
+
+    if baselined and record_baseline:
+        save_source_manifest(app.l10n_dir, manifest)
+        print(f"📌 {app.name}: recorded source hashes for {baselined} existing translation(s)")
+
+    return missing, stale
+
+
+def to_translate(missing, stale):
+    """Missing + stale = what needs translating, per locale."""
+    return {lang: sorted(set(missing[lang]) | set(stale[lang])) for lang in missing}
+
+
+def summary_text(missing, stale):
+    lines = []
+    for lang, keys in missing.items():
+        lines.append(f"--- Missing keys in {lang.upper()} ---\n")
+        if keys:
+            for k in keys:
+                lines.append(f"  {k}\n")
+        else:
+            lines.append("  None ✅\n")
+        lines.append("\n")
+    for lang, keys in stale.items():
+        lines.append(f"--- Stale keys in {lang.upper()} (English changed) ---\n")
+        if keys:
+            for k in keys:
+                lines.append(f"  {k}\n")
+        else:
+            lines.append("  None ✅\n")
+        lines.append("\n")
+    return "".join(lines)
+
+
+def main():
+    for app in load_apps():
+        audit = audit_app(app)
+        if audit is None:
+            print(f"🚫 {app.name}: template ARB not found ({app.arb_path(app.template_locale)})")
+            continue
+        missing, stale = audit
+
+        # Write JSON reports and summary
+        write_artifact(app.output_dir / "missing_strings_report.json",
+                       json.dumps(to_translate(missing, stale), ensure_ascii=False, indent=2))
+        write_artifact(app.output_dir / "stale_strings_report.json",
+                       json.dumps(stale, ensure_ascii=False, indent=2))
+        write_artifact(app.output_dir / "missing_summary.txt", summary_text(missing, stale))
 
-    for lang, path in LANG_FILES.items():
-        data = load_arb(path)
-        lang_keys = {k for k in data.keys() if not k.startswith("@")}
-        missing_keys = sorted(en_keys - lang_keys)
-        missing[lang] = missing_keys
-
-    # Write JSON report
-    report_path = OUTPUT_DIR / "missing_strings_report.json"
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(missing, f, ensure_ascii=False, indent=2)
-
-    # Write summary
-    summary_path = OUTPUT_DIR / "missing_summary.txt"
-    with open(summary_path, "w", encoding="utf-8") as f:
-        for lang, keys in missing.items():
-            f.write(f"--- Missing keys in {lang.upper()} ---\n")
-            if keys:
-                for k in keys:
-                    f.write(f"  {k}\n")
-            else:
-                f.write("  None ✅\n")
-            f.write("\n")
-
-    print("✅ Missing string check complete. Output saved to /output.")
+        for lang in missing:
+            print(f"🌍 {app.name} {lang}: {len(missing[lang])} missing, {len(stale[lang])} stale")
+        print(f"📄 Output: {app.output_dir}")
+    print("✅ Missing string check complete.")
 
 if __name__ == "__main__":
     main()
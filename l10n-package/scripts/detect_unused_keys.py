@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Detect unused and dangling l10n keys.
+Collects every `l10n.<key>` / `AppLocalizations.of(context)!.<key>`
+reference under lib/ in one pass and joins it against app_en.arb.
+Outputs: unused_keys_report.json
+
+Usage:
+  python detect_unused_keys.py           # report only
+  python detect_unused_keys.py --prune   # also drop unused keys from every locale ARB
+"""
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+from arb_utils import load_arb, locale_arb_files, message_keys, remove_keys, save_arb
+from artifact_store import write_artifact
+from l10n_rules import blank_comments, blank_directives
+
+# === Paths ===
+ROOT = Path(__file__).resolve().parents[2]
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+APP_LIB = ROOT / "lib"
+L10N_DIR = APP_LIB / "l10n"
+EN_FILE = L10N_DIR / "app_en.arb"
+REPORT_FILE = OUTPUT_DIR / "unused_keys_report.json"
+
+# === Exclusions ===
+EXCLUDE_DIRS = {"l10n", "generated", ".dart_tool", "build"}
+
+# Members of AppLocalizations that are not message keys
+IGNORED_MEMBERS = {"localeName"}
+
+# === Reference pattern ===
+# context.l10n.key / l10n.key  |  AppLocalizations.of(context)!.key
+L10N_REF_PATTERN = re.compile(
+    r'\bl10n\s*\.\s*([A-Za-z_]\w*)'
+    r'|\bAppLocalizations\s*\.\s*of\s*\(\s*\w+\s*\)\s*!?\s*\.\s*([A-Za-z_]\w*)'
+)
+
+
+def count_references(content: str) -> Counter:
+    """
+    Count l10n key references in a chunk of Dart source.
+    Only comments and import/export/part lines are blanked, so
+    `import '.../l10n/l10n.dart';` is not a reference to a key `dart`.
+    (Step 1's exclude_line_patterns would also hide any line mentioning
+    print or log., e.g. context.l10n.fingerprintUnlock.)
+    """
+    counts = Counter()
+    for match in L10N_REF_PATTERN.finditer(blank_directives(blank_comments(content))):
+        key = match.group(1) or match.group(2)
+        if key not in IGNORED_MEMBERS:
+            counts[key] += 1
+    return counts
+
+
+def iter_dart_files(app_lib: Path):
+    """Yield every non-generated Dart file under app_lib."""
+    for root, dirs, files in os.walk(app_lib):
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        for file in files:
+            if not file.endswith('.dart'):
+                continue
+            if file.endswith('.g.dart') or file.endswith('.freezed.dart'):
+                continue
+            yield Path(root) / file
+
+
+def scan_references(app_lib: Path) -> Counter:
+    """Collect l10n references across all Dart files in a single pass."""
+    counts = Counter()
+
+    if not app_lib.exists():
+        print(f"🚫 Directory not found: {app_lib}")
+        return counts
+
+    for file_path in iter_dart_files(app_lib):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"⚠️  Error reading {file_path}: {e}")
+            continue
+        counts.update(count_references(content))
+
+    return counts
+
+
+def build_report(references: Counter, en_keys: set) -> dict:
+    """Join code references against the ARB key index."""
+    referenced = set(references)
+    return {
+        "unused": sorted(en_keys - referenced),
+        "dangling": sorted(referenced - en_keys),
+        "reference_counts": {k: references[k] for k in sorted(referenced)},
+    }
+
+
+def prune_unused(unused: list, l10n_dir: Path) -> dict:
+    """Remove unused keys (and their @metadata) from every locale ARB."""
+    pruned = {}
+    unused_set = set(unused)
+
+    for locale, path in locale_arb_files(l10n_dir).items():
+        data = load_arb(path)
+        removed = message_keys(data) & unused_set
+        if not removed:
+            continue
+        save_arb(path, remove_keys(data, removed))
+        pruned[locale] = len(removed)
+        print(f"✂️  {path.name}: removed {len(removed)} keys")
+
+    return pruned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect unused and dangling l10n keys.")
+    parser.add_argument("--prune", action="store_true",
+                        help="remove unused keys from all locale ARBs")
+    args = parser.parse_args()
+
+    if not EN_FILE.exists():
+        print(f"🚫 English ARB not found: {EN_FILE}")
+        return
+
+    print("🔍 Collecting l10n references...")
+    print(f"📁 App lib: {APP_LIB}\n")
+
+    references = scan_references(APP_LIB)
+    en_keys = message_keys(load_arb(EN_FILE))
+    report = build_report(references, en_keys)
+
+    write_artifact(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"📋 {len(en_keys)} keys in {EN_FILE.name}, "
+          f"{len(references)} referenced ({sum(references.values())} references)")
+    print(f"🗑️  Unused keys: {len(report['unused'])}")
+    print(f"❓ Dangling references: {len(report['dangling'])}")
+    for key in report["dangling"]:
+        print(f"   {key} ({references[key]}x)")
+    print(f"📄 Output: {REPORT_FILE}")
+
+    if args.prune and report["unused"]:
+        print("\n✂️  Pruning unused keys from locale ARBs...")
+        pruned = prune_unused(report["unused"], L10N_DIR)
+        print(f"✅ Pruned {sum(pruned.values())} entries across {len(pruned)} locale(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of per-file extraction results.
+Entries are keyed by the SHA-256 of the file content, so identical files in
+different apps share one entry; a (mtime, size) record per path avoids even
+hashing files that have not changed. The whole cache is dropped when the
+extraction rules change.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+from artifact_store import atomic_write
+from l10n_rules import RULES_FILE
+
+# === Paths ===
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+CACHE_FILE = OUTPUT_DIR / ".extraction_cache.json"
+
+# Bump when step 1's extraction logic or the entry layout changes
+CACHE_VERSION = 6
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """Content-addressed extraction results plus a path -> stat index."""
+
+    def __init__(self, cache_file: Path = CACHE_FILE, rules_file: Path = RULES_FILE):
+        self.cache_file = cache_file
+        self.rules_digest = file_digest(Path(rules_file).read_bytes())
+        self.paths = {}    # absolute path -> [mtime_ns, size, digest]
+        self.entries = {}  # digest -> extraction result
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.cache_file.is_file():
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION or data.get("rules") != self.rules_digest:
+            return
+        self.paths = data.get("paths", {})
+        self.entries = data.get("entries", {})
+
+    def get(self, path: Path):
+        """
+        Return (digest, entry) for a file; entry is None on a miss.
+        The file is only read when its mtime/size changed.
+        """
+        key = str(Path(path).resolve())
+        stat = Path(path).stat()
+        record = self.paths.get(key)
+        if record and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+            digest = record[2]
+        else:
+            digest = file_digest(Path(path).read_bytes())
+            self.paths[key] = [stat.st_mtime_ns, stat.st_size, digest]
+
+        entry = self.entries.get(digest)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return digest, entry
+
+    def put(self, digest: str, entry: dict):
+        self.entries[digest] = entry
+
+    def save(self):
+        """Drop records for deleted files and unreferenced entries, then write."""
+        self.paths = {p: r for p, r in self.paths.items() if Path(p).exists()}
+        live = {record[2] for record in self.paths.values()}
+        self.entries = {d: e for d, e in self.entries.items() if d in live}
+
+        atomic_write(self.cache_file, json.dumps({
+            "version": CACHE_VERSION,
+            "rules": self.rules_digest,
+            "paths": self.paths,
+            "entries": self.entries,
+        }, ensure_ascii=False))
@@ -2,99 +2,182 @@
 """
 Batch translate missing strings from English to target languages.
 Processes 50 strings at a time for much faster translation.
+Reads the deduplicated output/translation_queue.json from scan_monorepo.py,
+so an English text needed by several apps (or keys) is translated once.
+Outputs (per app): output/<app>/missing_translations_<lang>.arb (+ .sources.json)
 """
 import json
 import os
+import re
 import time
 from googletrans import Translator
 
+from arb_utils import source_hash
+from artifact_store import write_artifact
+from l10n_config import load_apps
+from validate_arb import parse_message, placeholder_names
+
 # ----------------------------
 # 🔧 CONFIGURATION
 # ----------------------------
 BATCH_SIZE = 50  # Translate 50 strings at once
 DELAY_BETWEEN_BATCHES = 1  # seconds
+GLOSSARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "glossary")
+QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output", "translation_queue.json")
+PROTECTED_TOKEN = re.compile(r"\{\s*[gG]\s*(\d+)\s*\}")
+# Simple {name} ICU placeholders (as step 1 produces for interpolated strings)
+ICU_PLACEHOLDER = re.compile(r"\{[A-Za-z_][A-Za-z0-9_]*\}")
+
+
+def load_glossary(lang_code):
+    """
+    Loads glossary/glossary_<lang>.json as (terms, pattern):
+    terms maps lowercased source term -> replacement (the fixed translation,
+    or the term itself for do-not-translate entries); pattern matches any
+    term as a whole word, longest first.
+    """
+    path = os.path.join(GLOSSARY_DIR, f"glossary_{lang_code}.json")
+    if not os.path.isfile(path):
+        return {}, None
+    
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    terms = {src.lower(): dst for src, dst in data.get("terms", {}).items()}
+    for term in data.get("do_not_translate", []):
+        terms[term.lower()] = term
+    if not terms:
+        return {}, None
+    
+    alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return terms, re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+def protect_terms(text, terms, pattern, replacements=None):
+    """
+    Replaces glossary terms with {g0}, {g1}, ... and returns (masked, replacements).
+    Pass replacements to continue numbering after tokens already used.
+    """
+    replacements = [] if replacements is None else replacements
+    
+    def mask(match):
+        replacements.append(terms[match.group(0).lower()])
+        return f"{{g{len(replacements) - 1}}}"
+    
+    return pattern.sub(mask, text), replacements
+
+
+def protect_placeholders(text, replacements):
+    """Masks {name} placeholders with the next {gN} tokens so the translator can't touch them."""
+    def mask(match):
+        replacements.append(match.group(0))
+        return f"{{g{len(replacements) - 1}}}"
+    
+    return ICU_PLACEHOLDER.sub(mask, text)
+
+
+def message_placeholders(message):
+    """Placeholder names used by an ICU message, or None if it doesn't parse."""
+    ast, error = parse_message(message)
+    return None if error else placeholder_names(ast)
+
+
+def restore_terms(text, replacements):
+    """Substitutes protected tokens back; returns (text, number of tokens lost)."""
+    found = set()
+    
+    def unmask(match):
+        index = int(match.group(1))
+        if index >= len(replacements):
+            return match.group(0)
+        found.add(index)
+        return replacements[index]
+    
+    return PROTECTED_TOKEN.sub(unmask, text), len(replacements) - len(found)
+
+def split_queue_ref(ref):
+    """'app:key' -> ('app', 'key')"""
+    app_name, key = ref.split(":", 1)
+    return app_name, key
 
 def generate_missing_translations():
     """
-    Reads missing string keys from missing_strings_report.json,
-    fetches their English text from app_en.arb,
-    translates them in batches, and outputs per-language ARB files.
+    Reads the deduplicated translation queue (English text -> app:key refs
+    per language), translates each unique text once in batches, and
+    writes per-app, per-language ARB files.
     """
     
     # ----------------------------
     # 📂 PATH SETUP
     # ----------------------------
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.abspath(os.path.join(base_dir, "../../.."))
+    apps = {app.name: app for app in load_apps()}
     
-    english_arb_path = os.path.join(
-        project_root, "cng_customer", "lib", "l10n", "app_en.arb"
-    )
-    missing_report_path = os.path.join(
-        project_root, "python", "arb", "output", "missing_strings_report.json"
-    )
-    output_dir = os.path.join(project_root, "python", "arb", "output")
-    os.makedirs(output_dir, exist_ok=True)
-    
-    print("📂 English ARB file:", english_arb_path)
-    print("📂 Missing strings report:", missing_report_path)
-    print("📂 Output directory:", output_dir)
+    print("📂 Translation queue:", QUEUE_FILE)
+    print("📂 Apps:", ", ".join(apps))
     print("=" * 70)
     
     # ----------------------------
     # 📥 LOAD FILES
     # ----------------------------
-    if not os.path.isfile(english_arb_path):
+    if not os.path.isfile(QUEUE_FILE):
         raise FileNotFoundError(
-            f"❌ English ARB file not found at: {english_arb_path}"
+            f"❌ Translation queue not found at: {QUEUE_FILE} — run scan_monorepo.py first"
         )
     
-    if not os.path.isfile(missing_report_path):
-        raise FileNotFoundError(
-            f"❌ Missing strings report not found at: {missing_report_path}"
-        )
-    
-    with open(english_arb_path, "r", encoding="utf-8") as f:
-        english_arb = json.load(f)
-    
-    with open(missing_report_path, "r", encoding="utf-8") as f:
-        missing_report = json.load(f)
-    
-    # Filter out metadata keys (starting with @)
-    english_strings = {
-        k: v for k, v in english_arb.items() 
-        if not k.startswith('@') and isinstance(v, str)
-    }
+    with open(QUEUE_FILE, "r", encoding="utf-8") as f:
+        queue = json.load(f)
     
     # ----------------------------
     # 🌍 TRANSLATE BY LANGUAGE
     # ----------------------------
     translator = Translator()
     
-    for lang_code, keys in missing_report.items():
+    for lang_code, texts in queue["translate"].items():
+        refs = sum(len(r) for r in texts.values())
         print(f"\n{'=' * 70}")
         print(f"🌍 TRANSLATING TO: {lang_code.upper()}")
-        print(f"📊 Total strings: {len(keys)}")
+        print(f"📊 Unique strings: {len(texts)} (for {refs} keys)")
         print(f"⚙️  Batch size: {BATCH_SIZE}")
         print(f"{'=' * 70}\n")
         
-        # Build list of (key, english_text) pairs
-        to_translate = []
-        for key in keys:
-            english_value = english_strings.get(key)
-            if english_value:
-                to_translate.append((key, english_value))
-            else:
-                print(f"⚠️  Skipping '{key}' — not found in app_en.arb")
+        # Each unique English text is translated once; the text is its own key
+        to_translate = [(text, text) for text in texts if text.strip()]
         
         if not to_translate:
             print(f"⚠️  No valid strings to translate for {lang_code}")
             continue
         
         # ----------------------------
-        # 🔄 BATCH TRANSLATION
+        # 📖 GLOSSARY + PLACEHOLDERS
         # ----------------------------
         translated_output = {}
+        protected = {}
+        with_terms = 0
+        requested = len(to_translate)
+        terms, term_pattern = load_glossary(lang_code)
+        
+        remaining = []
+        for key, text in to_translate:
+            exact = terms.get(text.strip().lower()) if terms else None
+            if exact is not None:
+                # Whole string is a glossary term: no translator call
+                translated_output[key] = exact
+                print(f"📖 {key} (glossary)")
+                continue
+            replacements = []
+            masked = protect_placeholders(text, replacements)
+            if terms:
+                placeholders = len(replacements)
+                masked, replacements = protect_terms(masked, terms, term_pattern, replacements)
+                with_terms += len(replacements) > placeholders
+            if replacements:
+                protected[key] = replacements
+            remaining.append((key, masked))
+        to_translate = remaining
+        
+        # ----------------------------
+        # 🔄 BATCH TRANSLATION
+        # ----------------------------
         total = len(to_translate)
         
         for i in range(0, total, BATCH_SIZE):
@@ -133,10 +216,13 @@ def generate_missing_translations():
                             time.sleep(0.1)
                         except Exception as e:
                             print(f"✗ Error: {key} — {e}")
-                            translated_texts.append(text)
+                            translated_texts.append(None)
                 
-                # Store results
+                # Store results (failed strings stay missing: no English
+                # fallback, so no source hash claims they were translated)
                 for (key, original), translated in zip(batch, translated_texts):
+                    if translated is None:
+                        continue
                     translated_output[key] = translated.strip()
                     print(f"✓ {key}")
                 
@@ -154,31 +240,82 @@ def generate_missing_translations():
                         print(f"✓ {key}")
                         time.sleep(0.1)
                     except Exception as err:
-                        print(f"✗ Error: {key} — {err}")
-                        translated_output[key] = text  # fallback to English
+                        print(f"✗ Error: {key} — {err}")  # stays missing
             
             # Delay between batches to avoid rate limiting
             if i + BATCH_SIZE < total:
                 time.sleep(DELAY_BETWEEN_BATCHES)
         
+        # Put protected placeholders and glossary terms back. A translation
+        # that lost a token is left out (no output, no source hash), so the
+        # key stays missing and is queued again on the next run
+        lost = 0
+        for key, replacements in protected.items():
+            if key in translated_output:
+                restored, missing_tokens = restore_terms(translated_output[key], replacements)
+                if missing_tokens:
+                    del translated_output[key]
+                    lost += 1
+                    print(f"✗ {key}: translator dropped {missing_tokens} protected token(s) — left untranslated")
+                else:
+                    translated_output[key] = restored
+        
+        # A translation must use exactly the English message's placeholders
+        # (key is the English text); anything else would fail validate_arb
+        mismatched = 0
+        for key in list(translated_output):
+            expected = message_placeholders(key)
+            if expected is not None and message_placeholders(translated_output[key]) != expected:
+                del translated_output[key]
+                mismatched += 1
+                print(f"✗ {key}: placeholders changed in translation — left untranslated")
+        
         # ----------------------------
         # 💾 SAVE OUTPUT
         # ----------------------------
-        output_file = os.path.join(
-            output_dir, 
-            f"missing_translations_{lang_code}.arb"
-        )
-        
-        # Sort keys alphabetically
-        sorted_output = {k: translated_output[k] for k in sorted(translated_output.keys())}
+        # Fan each translation out to every app:key that asked for it
+        per_app = {}
+        for text, translated in translated_output.items():
+            for ref in texts[text]:
+                app_name, key = split_queue_ref(ref)
+                per_app.setdefault(app_name, {})[key] = (translated, text)
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(sorted_output, f, ensure_ascii=False, indent=2)
+        for app_name, entries in sorted(per_app.items()):
+            if app_name not in apps:
+                print(f"⚠️  {app_name} is not in l10n_apps.json — skipping")
+                continue
+            output_dir = apps[app_name].output_dir
+            output_file = os.path.join(output_dir, f"missing_translations_{lang_code}.arb")
+            
+            # Sort keys alphabetically
+            sorted_output = {k: entries[k][0] for k in sorted(entries)}
+            # Plain file so translations can be reviewed and fixed by hand before merging
+            write_artifact(output_file, json.dumps(sorted_output, ensure_ascii=False, indent=2), link=False)
+            
+            # Record which English text each translation came from (merged into
+            # translation_sources.json so later edits to app_en.arb are detected)
+            sources_file = os.path.join(output_dir, f"missing_translations_{lang_code}.sources.json")
+            sources = {k: source_hash(entries[k][1]) for k in sorted(entries)}
+            write_artifact(sources_file, json.dumps(sources, ensure_ascii=False, indent=2))
+            print(f"📄 {app_name}: {len(sorted_output)} keys → {output_file}")
         
         print(f"\n{'=' * 70}")
         print(f"✅ COMPLETED: {lang_code.upper()}")
-        print(f"📊 Translated: {len(translated_output)}/{total} strings")
-        print(f"📄 Output: {output_file}")
+        print(f"📊 Translated: {len(translated_output)}/{requested} unique strings "
+              f"({refs - requested} duplicate requests skipped)")
+        if terms:
+            local = requested - total
+            batches_saved = (
+                (requested + BATCH_SIZE - 1) // BATCH_SIZE
+                - (total + BATCH_SIZE - 1) // BATCH_SIZE
+            )
+            print(f"📖 Glossary: {local} resolved locally "
+                  f"({local} strings / {batches_saved} batch calls saved), "
+                  f"{with_terms} with protected terms")
+        if lost:
+            print(f"⚠️  {lost} translation(s) dropped for lost protected tokens")
+        if mismatched:
+            print(f"⚠️  {mismatched} translation(s) dropped for changed placeholders")
         print(f"{'=' * 70}")
     
     print("\n" + "=" * 70)
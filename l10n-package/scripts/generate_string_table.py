@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Generate compact per-locale string tables from the audited ARB files.
+Each locale becomes one packed UTF-8 blob with an offsets array; a single
+key -> index map is shared across locales and exposed to Dart through a
+small generated accessor.
+Only plain messages go into the tables: ICU messages with placeholders or
+plural/select need gen-l10n's formatting, so those keys are left to
+AppLocalizations (a table lookup would return the raw ICU text).
+Outputs: string_tables/strings_<locale>.bin, string_keys.json, string_table.dart
+
+Binary layout (little-endian):
+  magic "NSTB" | u32 key_count | u32 string_count
+  u32[key_count]        slot of each key in the string list (MISSING if absent)
+  u32[string_count + 1] byte offsets into the blob
+  blob                  deduplicated UTF-8 values
+"""
+import json
+import struct
+from pathlib import Path
+
+from arb_utils import load_arb, locale_arb_files, message_keys
+from artifact_store import write_artifact
+from validate_arb import parse_message
+
+# === Paths ===
+ROOT = Path(__file__).resolve().parents[2]
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+L10N_DIR = ROOT / "lib" / "l10n"
+TABLE_DIR = OUTPUT_DIR / "string_tables"
+KEYS_FILE = TABLE_DIR / "string_keys.json"
+DART_FILE = TABLE_DIR / "string_table.dart"
+
+# === Format ===
+MAGIC = b"NSTB"
+HEADER = struct.Struct("<4sII")
+MISSING = 0xFFFFFFFF
+TEMPLATE_LOCALE = "en"
+ASSET_DIR = "assets/l10n"
+
+DART_RESERVED = {
+    "abstract", "as", "assert", "async", "await", "break", "case", "catch",
+    "class", "const", "continue", "default", "do", "else", "enum", "extends",
+    "false", "final", "finally", "for", "if", "in", "is", "new", "null",
+    "return", "super", "switch", "this", "throw", "true", "try", "var",
+    "void", "while", "with",
+}
+
+
+def is_plain_message(value) -> bool:
+    """True for a string that is literal text once parsed as ICU (no arguments)."""
+    if not isinstance(value, str):
+        return False
+    ast, error = parse_message(value)
+    return error is None and all(node[0] == "text" for node in ast)
+
+
+def plain_messages(arb_data: dict) -> dict:
+    """The ARB's messages that can be served verbatim from a table."""
+    return {k: arb_data[k] for k in message_keys(arb_data) if is_plain_message(arb_data[k])}
+
+
+def build_table(keys: list, messages: dict) -> bytes:
+    """Pack one locale's messages into the binary table format."""
+    slots = []
+    strings = []
+    string_index = {}
+
+    for key in keys:
+        value = messages.get(key)
+        if not isinstance(value, str):
+            slots.append(MISSING)
+            continue
+        if value not in string_index:
+            string_index[value] = len(strings)
+            strings.append(value)
+        slots.append(string_index[value])
+
+    blob = bytearray()
+    offsets = [0]
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    return (
+        HEADER.pack(MAGIC, len(keys), len(strings))
+        + struct.pack(f"<{len(slots)}I", *slots)
+        + struct.pack(f"<{len(offsets)}I", *offsets)
+        + bytes(blob)
+    )
+
+
+def read_table(data: bytes) -> list:
+    """Decode a binary table back into a list of values indexed by key (None if missing)."""
+    magic, key_count, string_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a string table (bad magic)")
+
+    pos = HEADER.size
+    slots = struct.unpack_from(f"<{key_count}I", data, pos)
+    pos += 4 * key_count
+    offsets = struct.unpack_from(f"<{string_count + 1}I", data, pos)
+    pos += 4 * (string_count + 1)
+    blob = data[pos:]
+
+    values = []
+    for slot in slots:
+        if slot == MISSING:
+            values.append(None)
+        else:
+            values.append(blob[offsets[slot]:offsets[slot + 1]].decode("utf-8"))
+    return values
+
+
+def verify_table(data: bytes, keys: list, messages: dict) -> list:
+    """Round-trip every key; return a list of mismatch descriptions."""
+    errors = []
+    decoded = read_table(data)
+    if len(decoded) != len(keys):
+        return [f"key count mismatch: {len(decoded)} != {len(keys)}"]
+
+    for key, value in zip(keys, decoded):
+        expected = messages.get(key)
+        if not isinstance(expected, str):
+            expected = None
+        if value != expected:
+            errors.append(f"{key}: {value!r} != {expected!r}")
+    return errors
+
+
+def dart_identifier(key: str) -> str:
+    """ARB keys are already Dart identifiers; guard against reserved words."""
+    return f"{key}_" if key in DART_RESERVED else key
+
+
+def generate_dart(keys: list) -> str:
+    """Generate the Dart accessor for the string tables."""
+    lines = [
+        "// GENERATED CODE - DO NOT MODIFY BY HAND",
+        "// Generated by l10n-package/scripts/generate_string_table.py",
+        "",
+        "import 'dart:convert';",
+        "import 'dart:typed_data';",
+        "",
+        "import 'package:flutter/services.dart' show rootBundle;",
+        "",
+        "/// Compact per-locale string table backed by one packed UTF-8 blob.",
+        "class StringTable {",
+        "  StringTable._(this._data, this._keyCount, this._stringCount)",
+        "      : _cache = List<String?>.filled(_keyCount, null);",
+        "",
+        f"  static const int _missing = 0x{MISSING:X};",
+        f"  static const int _headerSize = {HEADER.size};",
+        "",
+        "  final ByteData _data;",
+        "  final int _keyCount;",
+        "  final int _stringCount;",
+        "  final List<String?> _cache;",
+        "",
+        "  static Future<StringTable> load(String locale) async {",
+        f"    final data = await rootBundle.load('{ASSET_DIR}/strings_$locale.bin');",
+        "    return StringTable.fromByteData(data);",
+        "  }",
+        "",
+        "  factory StringTable.fromByteData(ByteData data) {",
+        f"    const magic = [{', '.join(str(b) for b in MAGIC)}];",
+        "    for (var i = 0; i < magic.length; i++) {",
+        "      if (data.getUint8(i) != magic[i]) {",
+        "        throw const FormatException('Invalid string table');",
+        "      }",
+        "    }",
+        "    return StringTable._(",
+        "      data,",
+        "      data.getUint32(4, Endian.little),",
+        "      data.getUint32(8, Endian.little),",
+        "    );",
+        "  }",
+        "",
+        "  /// Returns the message for [key] (a [StringKeys] constant), or null if",
+        "  /// this locale has no translation for it. Messages with placeholders or",
+        "  /// plural/select are not in the table; use AppLocalizations for those.",
+        "  String? operator [](int key) {",
+        "    final cached = _cache[key];",
+        "    if (cached != null) return cached;",
+        "",
+        "    final slot = _data.getUint32(_headerSize + key * 4, Endian.little);",
+        "    if (slot == _missing) return null;",
+        "",
+        "    final offsetsStart = _headerSize + _keyCount * 4;",
+        "    final blobStart = offsetsStart + (_stringCount + 1) * 4;",
+        "    final start = _data.getUint32(offsetsStart + slot * 4, Endian.little);",
+        "    final end = _data.getUint32(offsetsStart + (slot + 1) * 4, Endian.little);",
+        "    final bytes = _data.buffer.asUint8List(",
+        "      _data.offsetInBytes + blobStart + start,",
+        "      end - start,",
+        "    );",
+        "    return _cache[key] = utf8.decode(bytes);",
+        "  }",
+        "}",
+        "",
+        "/// Key indexes shared by every locale's string table.",
+        "abstract final class StringKeys {",
+    ]
+    for index, key in enumerate(keys):
+        lines.append(f"  static const int {dart_identifier(key)} = {index};")
+    lines.append("}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    print("🗜️  Generating compact string tables...\n")
+
+    arb_files = locale_arb_files(L10N_DIR)
+    if TEMPLATE_LOCALE not in arb_files:
+        print(f"🚫 Template ARB not found: {L10N_DIR / f'app_{TEMPLATE_LOCALE}.arb'}")
+        return
+
+    TABLE_DIR.mkdir(parents=True, exist_ok=True)
+    locales = {locale: load_arb(path) for locale, path in arb_files.items()}
+    template_keys = message_keys(locales[TEMPLATE_LOCALE])
+    keys = sorted(plain_messages(locales[TEMPLATE_LOCALE]))
+    key_set = set(keys)
+    formatted = sorted(template_keys - key_set)
+
+    write_artifact(KEYS_FILE, json.dumps({k: i for i, k in enumerate(keys)}, ensure_ascii=False, indent=2))
+    write_artifact(DART_FILE, generate_dart(keys))
+
+    print(f"{'locale':<8}{'keys':>7}{'missing':>9}{'arb':>10}{'json':>10}{'table':>10}{'saved':>8}")
+    failed = False
+
+    for locale, arb_data in locales.items():
+        messages = plain_messages(arb_data)
+        table = build_table(keys, messages)
+
+        errors = verify_table(table, keys, messages)
+        if errors:
+            failed = True
+            print(f"❌ {locale}: {len(errors)} round-trip error(s)")
+            for error in errors[:10]:
+                print(f"   {error}")
+            continue
+
+        table_path = TABLE_DIR / f"strings_{locale}.bin"
+        write_artifact(table_path, table)
+
+        arb_size = arb_files[locale].stat().st_size
+        json_size = len(json.dumps(
+            {k: v for k, v in messages.items() if k in key_set},
+            ensure_ascii=False, separators=(",", ":"),
+        ).encode("utf-8"))
+        missing = sum(1 for k in keys if not isinstance(messages.get(k), str))
+        saved = 100 * (1 - len(table) / arb_size) if arb_size else 0.0
+        print(f"{locale:<8}{len(keys):>7}{missing:>9}{arb_size:>10}{json_size:>10}{len(table):>10}{saved:>7.1f}%")
+
+    if formatted:
+        print(f"\n⏭️  {len(formatted)} ICU message(s) with placeholders or plural/select "
+              f"left to gen-l10n: {', '.join(formatted[:5])}{', ...' if len(formatted) > 5 else ''}")
+    print(f"\n📄 Key map: {KEYS_FILE}")
+    print(f"📄 Dart accessor: {DART_FILE}")
+    if failed:
+        print("❌ Some tables failed verification and were not written")
+    else:
+        print(f"✅ All tables verified — copy strings_*.bin into {ASSET_DIR}/")
+
+
+if __name__ == "__main__":
+    main()
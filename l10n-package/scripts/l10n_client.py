@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Client for l10n_server.py.
+Uses the running server when there is one; otherwise builds the index
+in-process (cold start) and answers the query directly.
+
+Usage:
+  python l10n_client.py lookup "Add habit"
+  python l10n_client.py suggest "Add habit"
+  python l10n_client.py audit
+  python l10n_client.py status
+"""
+import argparse
+import json
+import sys
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from l10n_server import DEFAULT_PORT, HOST
+
+CONNECT_TIMEOUT = 0.5  # seconds
+
+
+def query_server(port: int, name: str, params: dict):
+    """Return the server's answer, or None if no server is listening."""
+    url = f"http://{HOST}:{port}/{name}"
+    if params:
+        url += "?" + urlencode(params)
+    try:
+        with urlopen(url, timeout=CONNECT_TIMEOUT) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except HTTPError as e:
+        return json.loads(e.read().decode("utf-8"))
+    except (URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def query_local(name: str, params: dict) -> dict:
+    """Cold path: build the index in this process."""
+    from l10n_server import L10nIndex
+    return L10nIndex().query(name, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the l10n analysis server.")
+    parser.add_argument("query", choices=["lookup", "suggest", "audit", "status"])
+    parser.add_argument("text", nargs="?", default="")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    params = {"text": args.text} if args.text else {}
+    result = query_server(args.port, args.query, params)
+    if result is None:
+        print("ℹ️  No server running — indexing locally", file=sys.stderr)
+        try:
+            result = query_local(args.query, params)
+        except ValueError as e:
+            result = {"error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if "error" in result:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Load the app roots the l10n tooling runs against (l10n_apps.json).
+Each app has its own lib and l10n dirs and locale set; the template
+locale (first in the list, "en" by default) is the source of keys.
+"""
+import json
+from pathlib import Path
+
+# === Paths ===
+ROOT = Path(__file__).resolve().parents[2]
+CONFIG_FILE = Path(__file__).resolve().parents[1] / "l10n_apps.json"
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+
+
+class AppConfig:
+    """One Flutter app or package scanned by the tooling."""
+
+    def __init__(self, entry: dict, base: Path = ROOT):
+        self.name = entry["name"]
+        self.root = (base / entry.get("root", ".")).resolve()
+        self.lib = self.root / entry.get("lib", "lib")
+        self.l10n_dir = self.root / entry.get("l10n", "lib/l10n")
+        self.locales = list(entry.get("locales", ["en"]))
+        self.template_locale = self.locales[0] if self.locales else "en"
+        # Per-app reports and translations: output/<app>/
+        self.output_dir = OUTPUT_DIR / self.name
+
+    def arb_path(self, locale: str) -> Path:
+        return self.l10n_dir / f"app_{locale}.arb"
+
+    @property
+    def target_locales(self) -> list:
+        """Locales translated from the template."""
+        return [loc for loc in self.locales if loc != self.template_locale]
+
+    def __repr__(self):
+        return f"AppConfig({self.name!r}, lib={self.lib})"
+
+
+def load_apps(config_file: Path = CONFIG_FILE) -> list:
+    """Return the configured apps, in file order."""
+    with open(config_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [AppConfig(entry) for entry in data["apps"]]
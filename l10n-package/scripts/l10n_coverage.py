@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Localization coverage per feature folder (features/habits, core/widgets, ...).
+Coverage for a locale = l10n references whose key exists in that locale's
+ARB / (all l10n references + hardcoded UI literals still in the code).
+Per-file literal and reference counts come from the shared extraction
+cache, so only files changed since the last run are re-read.
+Outputs: coverage_report.json
+         coverage_history.jsonl (one record appended per run)
+
+Usage:
+  python l10n_coverage.py                    # report, record, print deltas
+  python l10n_coverage.py --no-record        # report only (e.g. on PRs)
+  python l10n_coverage.py --fail-under 80    # exit 1 if a locale is below 80% overall
+  python l10n_coverage.py --max-drop 2       # exit 1 if a folder lost more than 2 points
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from arb_utils import load_arb, message_keys
+from artifact_store import locked, write_artifact
+from extraction_cache import ExtractionCache
+from l10n_config import load_apps
+from scan_monorepo import extract_all
+
+# === Paths ===
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+REPORT_FILE = OUTPUT_DIR / "coverage_report.json"
+HISTORY_FILE = OUTPUT_DIR / "coverage_history.jsonl"
+
+# Folder depth under lib/ that counts as one area (features/habits, core/widgets)
+AREA_DEPTH = 2
+TOTAL = "(total)"
+
+
+def area_for(app_lib: Path, path: Path) -> str:
+    """features/habits/ui/page.dart -> features/habits; lib/main.dart -> '.'"""
+    parts = path.parent.relative_to(app_lib).parts
+    return "/".join(parts[:AREA_DEPTH]) or "."
+
+
+def locale_keys(app) -> dict:
+    """{locale: message keys} for every locale ARB that exists."""
+    keys = {}
+    for locale in app.locales:
+        path = app.arb_path(locale)
+        keys[locale] = message_keys(load_arb(path)) if path.is_file() else set()
+    return keys
+
+
+def percent(localized: int, total: int) -> float:
+    return round(100 * localized / total, 2) if total else 100.0
+
+
+def app_coverage(app, file_entries: dict) -> dict:
+    """{area: {"literals", "references", "coverage": {locale: %}}} plus a total row."""
+    keys = locale_keys(app)
+    counts = {}  # area -> [literals, references, {locale: localized references}]
+
+    for path, entry in file_entries.items():
+        area = counts.setdefault(area_for(app.lib, path), [0, 0, dict.fromkeys(app.locales, 0)])
+        area[0] += entry["literals"]
+        for key, n in entry["refs"].items():
+            area[1] += n
+            for locale in app.locales:
+                if key in keys[locale]:
+                    area[2][locale] += n
+
+    totals = [0, 0, dict.fromkeys(app.locales, 0)]
+    for literals, references, localized in counts.values():
+        totals[0] += literals
+        totals[1] += references
+        for locale, n in localized.items():
+            totals[2][locale] += n
+
+    rows = {}
+    for area, (literals, references, localized) in sorted(counts.items()) + [(TOTAL, totals)]:
+        if not literals and not references and area != TOTAL:
+            continue
+        rows[area] = {
+            "literals": literals,
+            "references": references,
+            "coverage": {loc: percent(n, literals + references) for loc, n in localized.items()},
+        }
+    return rows
+
+
+def last_record(history_file: Path = HISTORY_FILE):
+    """Most recent history record, or None."""
+    if not history_file.is_file():
+        return None
+    last = None
+    with open(history_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    last = json.loads(line)
+                except ValueError:
+                    continue  # tolerate a torn line from an interrupted run
+    return last
+
+
+def append_record(record: dict, history_file: Path = HISTORY_FILE):
+    """Append one JSON line under the output dir lock."""
+    with locked(history_file.parent):
+        with open(history_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def coverage_deltas(current: dict, previous: dict) -> dict:
+    """{app: {area: {locale: points}}} for areas present in both records."""
+    deltas = {}
+    for app_name, rows in current.items():
+        before = (previous or {}).get(app_name, {})
+        for area, row in rows.items():
+            if area not in before:
+                continue
+            for locale, pct in row["coverage"].items():
+                old = before[area]["coverage"].get(locale)
+                if old is not None:
+                    deltas.setdefault(app_name, {}).setdefault(area, {})[locale] = round(pct - old, 2)
+    return deltas
+
+
+def format_delta(delta) -> str:
+    if delta is None:
+        return "new"
+    if abs(delta) < 0.005:
+        return "="
+    return f"{delta:+.2f}"
+
+
+def print_app(app, rows: dict, deltas: dict):
+    width = max(len(area) for area in rows)
+    header = f"{'folder':<{width}}{'literals':>10}{'refs':>7}"
+    for locale in app.locales:
+        header += f"{locale:>9}{'Δ':>8}"
+    print(f"\n📦 {app.name}")
+    print(header)
+    for area, row in rows.items():
+        line = f"{area:<{width}}{row['literals']:>10}{row['references']:>7}"
+        for locale in app.locales:
+            delta = deltas.get(area, {}).get(locale)
+            line += f"{row['coverage'][locale]:>8.1f}%{format_delta(delta):>8}"
+        print(line)
+
+
+def gate_failures(current: dict, deltas: dict, fail_under: float, max_drop: float) -> list:
+    failures = []
+    for app_name, rows in current.items():
+        if fail_under is not None:
+            for locale, pct in rows[TOTAL]["coverage"].items():
+                if pct < fail_under:
+                    failures.append(f"{app_name} {locale}: {pct:.2f}% is below {fail_under:.2f}%")
+        if max_drop is not None:
+            for area, by_locale in deltas.get(app_name, {}).items():
+                for locale, delta in by_locale.items():
+                    if -delta > max_drop:
+                        failures.append(f"{app_name} {area} {locale}: dropped {-delta:.2f} points")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-folder localization coverage.")
+    parser.add_argument("--no-record", action="store_true",
+                        help="don't append this run to coverage_history.jsonl")
+    parser.add_argument("--fail-under", type=float, metavar="PCT",
+                        help="exit 1 if any locale's overall coverage is below PCT")
+    parser.add_argument("--max-drop", type=float, metavar="POINTS",
+                        help="exit 1 if any folder's coverage fell by more than POINTS")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    apps = [app for app in load_apps() if app.lib.exists()]
+
+    cache = ExtractionCache()
+    file_entries = extract_all(apps, cache)
+    cache.save()
+    print(f"🗃️  Extraction cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+
+    current = {app.name: app_coverage(app, file_entries[app.name]) for app in apps}
+    previous = last_record()
+    deltas = coverage_deltas(current, previous["apps"] if previous else None)
+
+    for app in apps:
+        print_app(app, current[app.name], deltas.get(app.name, {}))
+
+    write_artifact(REPORT_FILE, json.dumps(current, ensure_ascii=False, indent=2))
+    if previous:
+        print(f"\n📈 Deltas vs. {previous['timestamp']}")
+    if not args.no_record:
+        append_record({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "apps": current,
+        })
+        print(f"🕒 Recorded in {HISTORY_FILE}")
+    print(f"📄 Output: {REPORT_FILE}")
+    print(f"⏱️  Done in {time.perf_counter() - started:.2f}s")
+
+    failures = gate_failures(current, deltas, args.fail_under, args.max_drop)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Load and compile the declarative extraction rules (extraction_rules.json).
+Shared by 1_extract_unlocalized.py and scan_unlocalized_text.py; the file
+is parsed and its regexes compiled once per process. The comment and
+directive blanking helpers are also used by the l10n reference scan in
+detect_unused_keys.py.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# === Paths ===
+RULES_FILE = Path(__file__).resolve().parents[1] / "extraction_rules.json"
+
+
+def _blank(match) -> str:
+    """Replace matched text with spaces, keeping newlines (offsets stay valid)."""
+    return re.sub(r"[^\n]", " ", match.group(0))
+
+
+def blank_comments(content: str) -> str:
+    """Blank out // and /* */ comments without shifting offsets."""
+    content = re.sub(r"//.*?$", _blank, content, flags=re.MULTILINE)
+    return re.sub(r"/\*.*?\*/", _blank, content, flags=re.DOTALL)
+
+
+DIRECTIVE_LINE = re.compile(r"^[ \t]*(?:import|export|part)\b.*$", re.MULTILINE)
+
+
+def blank_directives(content: str) -> str:
+    """Blank import/export/part directive lines without shifting offsets."""
+    return DIRECTIVE_LINE.sub(_blank, content)
+
+
+def compile_prefilter(triggers) -> re.Pattern:
+    """One alternation over every trigger literal (longest first)."""
+    literals = sorted(set(triggers), key=lambda t: (-len(t), t))
+    return re.compile("|".join(re.escape(t) for t in literals))
+
+
+class RuleSet:
+    """A compiled section of the rules file (e.g. "extract" or "scan")."""
+
+    def __init__(self, section: dict):
+        literal = section["literal"]
+        rules = section["rules"]
+        self.triggers = [rule["trigger"] for rule in rules]
+        self.patterns = [re.compile(rule["prefix"] + literal) for rule in rules]
+        # Single master regex over every rule
+        self.combined = re.compile("|".join(f"(?:{rule['prefix']}{literal})" for rule in rules))
+        self.prefilter = compile_prefilter(self.triggers)
+
+    def may_match(self, content: str) -> bool:
+        """Cheap keyword test: False means no rule can match this content."""
+        return self.prefilter.search(content) is not None
+
+
+class Rules:
+    """Compiled view of extraction_rules.json."""
+
+    def __init__(self, data: dict):
+        self.exclude_dirs = set(data["exclude_dirs"])
+        self.exclude_file_suffixes = tuple(data["exclude_file_suffixes"])
+        self.exclude_line_regex = re.compile(
+            "|".join(data["exclude_line_patterns"]), re.IGNORECASE
+        )
+        self.non_ui = set(data["non_ui"])
+        self.non_ui_substrings = tuple(data["non_ui_substrings"])
+        self.extract = RuleSet(data["extract"])
+        self.scan = RuleSet(data["scan"])
+
+    def is_source_file(self, filename: str) -> bool:
+        """True for Dart files that are not generated."""
+        return filename.endswith(".dart") and not filename.endswith(self.exclude_file_suffixes)
+
+    def clean_source(self, content: str) -> str:
+        """
+        Blank comments and excluded lines (imports, logging) in Dart source.
+        Lengths are kept, so positions in the result are file positions.
+        """
+        lines = blank_comments(content).split("\n")
+        return "\n".join(
+            " " * len(line) if self.exclude_line_regex.search(line) else line
+            for line in lines
+        )
+
+    def is_non_ui(self, text: str) -> bool:
+        """True for keywords, URLs and file names that are never UI text."""
+        lowered = text.lower()
+        return lowered in self.non_ui or any(x in lowered for x in self.non_ui_substrings)
+
+
+@lru_cache(maxsize=None)
+def load_rules(rules_file: Path = RULES_FILE) -> Rules:
+    """Parse and compile the rules file (cached per path)."""
+    with open(rules_file, "r", encoding="utf-8") as f:
+        return Rules(json.load(f))
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Warm-cache l10n analysis server for editors and tooling.
+Keeps per-file extraction results, the ARB key/value indexes for every
+locale and the compiled extraction rules in memory, and refreshes them
+incrementally (only changed files / ARBs) as the tree changes.
+
+Endpoints (GET, JSON):
+  /lookup?text=...   is this text localized, under which key(s)?
+  /suggest?text=...  key to use for this text (existing or new)
+  /audit             missing keys per locale + unlocalized strings
+  /status            index sizes and last refresh
+
+Usage:
+  python l10n_server.py [--port 8765]
+Query it with l10n_client.py.
+"""
+import argparse
+import importlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from arb_utils import load_arb, locale_arb_files, message_keys, normalise_text
+from l10n_rules import load_rules
+
+# Step scripts start with a digit, so they can't be imported by name
+extract_step = importlib.import_module("1_extract_unlocalized")
+generate_step = importlib.import_module("2_generate_arb")
+
+# === Paths ===
+ROOT = Path(__file__).resolve().parents[2]
+APP_LIB = ROOT / "lib"
+L10N_DIR = APP_LIB / "l10n"
+TEMPLATE_LOCALE = "en"
+
+# === Server ===
+HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("L10N_SERVER_PORT", "8765"))
+POLL_INTERVAL = 1.0  # seconds between change checks
+
+
+class L10nIndex:
+    """In-memory extraction and ARB indexes, refreshed incrementally."""
+
+    def __init__(self, app_lib: Path = APP_LIB, l10n_dir: Path = L10N_DIR):
+        self.app_lib = app_lib
+        self.l10n_dir = l10n_dir
+        self.rules = load_rules()
+        self.files = {}     # relative path -> (mtime_ns, size, strings)
+        self.arbs = {}      # locale -> (mtime_ns, data)
+        self.value_index = {}  # normalised English value -> [keys]
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+        self.refresh()
+
+    # --- incremental refresh ---
+
+    def refresh(self) -> dict:
+        """Re-read only files and ARBs whose mtime/size changed."""
+        with self.lock:
+            changed_files = self._refresh_sources()
+            changed_arbs = self._refresh_arbs()
+            self.last_refresh = time.time()
+        return {"files": changed_files, "arbs": changed_arbs}
+
+    def _refresh_sources(self) -> int:
+        changed = 0
+        seen = set()
+
+        for root, dirs, files in os.walk(self.app_lib):
+            dirs[:] = [d for d in dirs if d not in self.rules.exclude_dirs]
+            for file in files:
+                if not self.rules.is_source_file(file):
+                    continue
+                path = Path(root) / file
+                relative = str(path.relative_to(self.app_lib))
+                seen.add(relative)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                cached = self.files.get(relative)
+                if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    continue
+                strings = extract_step.extract_from_file(path)
+                self.files[relative] = (stat.st_mtime_ns, stat.st_size, strings)
+                changed += 1
+
+        for relative in set(self.files) - seen:
+            del self.files[relative]
+            changed += 1
+
+        return changed
+
+    def _refresh_arbs(self) -> int:
+        changed = 0
+        current = locale_arb_files(self.l10n_dir)
+
+        for locale, path in current.items():
+            mtime = path.stat().st_mtime_ns
+            cached = self.arbs.get(locale)
+            if cached and cached[0] == mtime:
+                continue
+            try:
+                self.arbs[locale] = (mtime, load_arb(path))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Error reading {path}: {e}")
+                continue
+            changed += 1
+
+        for locale in set(self.arbs) - set(current):
+            del self.arbs[locale]
+            changed += 1
+
+        if changed:
+            self.value_index = {}
+            for key, value in self._messages(TEMPLATE_LOCALE).items():
+                if isinstance(value, str):
+                    self.value_index.setdefault(normalise_text(value), []).append(key)
+
+        return changed
+
+    def _messages(self, locale: str) -> dict:
+        data = self.arbs.get(locale, (0, {}))[1]
+        return {k: data[k] for k in message_keys(data)}
+
+    # --- queries ---
+
+    def lookup(self, text: str) -> dict:
+        with self.lock:
+            keys = sorted(self.value_index.get(normalise_text(text), []))
+            translations = {}
+            if keys:
+                for locale in sorted(self.arbs):
+                    value = self._messages(locale).get(keys[0])
+                    if value is not None:
+                        translations[locale] = value
+            occurrences = sorted(
+                path for path, (_, _, strings) in self.files.items() if text in strings
+            )
+        return {
+            "text": text,
+            "localized": bool(keys),
+            "keys": keys,
+            "translations": translations,
+            "unlocalized_in": occurrences,
+        }
+
+    def suggest(self, text: str) -> dict:
+        with self.lock:
+            existing = sorted(self.value_index.get(normalise_text(text), []))
+            if existing:
+                return {"text": text, "key": existing[0], "existing": True}
+
+            key = generate_step.make_key_from_text(text)
+            if not key:
+                return {"text": text, "key": None, "existing": False}
+
+            taken = set(self._messages(TEMPLATE_LOCALE))
+            candidate, counter = key, 2
+            while candidate in taken:
+                candidate = f"{key}{counter}"
+                counter += 1
+        return {"text": text, "key": candidate, "existing": False}
+
+    def audit(self) -> dict:
+        with self.lock:
+            en_keys = set(self._messages(TEMPLATE_LOCALE))
+            missing = {
+                locale: sorted(en_keys - set(self._messages(locale)))
+                for locale in sorted(self.arbs) if locale != TEMPLATE_LOCALE
+            }
+            unlocalized = {}
+            for path, (_, _, strings) in self.files.items():
+                for text in strings:
+                    if normalise_text(text) not in self.value_index:
+                        unlocalized.setdefault(text, []).append(path)
+        return {
+            "missing": missing,
+            "unlocalized": {t: sorted(p) for t, p in sorted(unlocalized.items())},
+        }
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "files": len(self.files),
+                "locales": sorted(self.arbs),
+                "keys": len(self._messages(TEMPLATE_LOCALE)),
+                "last_refresh": self.last_refresh,
+            }
+
+    def query(self, name: str, params: dict) -> dict:
+        """Dispatch a query by name (shared by the server and the client fallback)."""
+        if name in ("lookup", "suggest"):
+            text = params.get("text", "")
+            if not text:
+                raise ValueError("missing 'text' parameter")
+            return getattr(self, name)(text)
+        if name in ("audit", "status"):
+            return getattr(self, name)()
+        raise KeyError(name)
+
+
+def make_handler(index: L10nIndex):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                started = time.perf_counter()
+                result = index.query(url.path.strip("/"), params)
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                self._send(200, result)
+            except KeyError:
+                self._send(404, {"error": f"unknown endpoint {url.path}"})
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def watch(index: L10nIndex, stop: threading.Event):
+    """Poll for changes and refresh the index incrementally."""
+    while not stop.wait(POLL_INTERVAL):
+        changed = index.refresh()
+        if changed["files"] or changed["arbs"]:
+            print(f"🔄 Refreshed {changed['files']} file(s), {changed['arbs']} ARB(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-cache l10n analysis server.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print("🔥 Warming l10n index...")
+    started = time.perf_counter()
+    index = L10nIndex()
+    status = index.status()
+    print(f"✅ Indexed {status['files']} files, {status['keys']} keys, "
+          f"locales: {', '.join(status['locales']) or 'none'} "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(index, stop), daemon=True).start()
+
+    server = ThreadingHTTPServer((HOST, args.port), make_handler(index))
+    print(f"🌐 Listening on http://{HOST}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
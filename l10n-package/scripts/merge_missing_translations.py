@@ -1,19 +1,124 @@
+import argparse
 import json
 import os
 import re
+from pathlib import Path
 
-def merge_missing_translations():
+from arb_utils import (
+    dump_arb, load_arb, load_source_manifest, message_keys, print_shard_report,
+    save_source_manifest, shard_report,
+)
+from artifact_store import atomic_write, write_artifact
+from l10n_config import load_apps
+
+# Per-feature shards written by 2_generate_arb.py --shard
+SHARDS_DIR = Path(__file__).resolve().parents[1] / "output" / "shards"
+
+def merge_into_shards(lang_code, missing_data, shards_dir=SHARDS_DIR):
     """
-    Appends the translated missing strings to their respective app_XX.arb files.
-    Handles proper JSON structure and indentation.
+    Splits translated strings across shards/<feature>/app_XX.arb using the
+    key index of each shard's app_en.arb.
+    Returns the keys that did not belong to any shard.
     """
+    remaining = dict(missing_data)
+
+    for shard_dir in sorted(p for p in shards_dir.iterdir() if p.is_dir()):
+        en_path = shard_dir / "app_en.arb"
+        if not en_path.is_file():
+            continue
+
+        shard_keys = message_keys(load_arb(en_path))
+        entries = {k: v for k, v in missing_data.items() if k in shard_keys}
+        if not entries:
+            continue
+
+        target_path = shard_dir / f"app_{lang_code}.arb"
+        target = load_arb(target_path) if target_path.is_file() else {"@@locale": lang_code}
+        target.update(entries)
+        write_artifact(target_path, dump_arb(target), link=False)  # shards are edited by translators
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.abspath(os.path.join(base_dir, "../../.."))
+        for key in entries:
+            remaining.pop(key, None)
+        print(f"🧩 {shard_dir.name}: merged {len(entries)} entries")
 
-    # Define directories
-    output_dir = os.path.join(project_root, "python", "arb", "output")
-    l10n_dir = os.path.join(project_root, "cng_customer", "lib", "l10n")
+    return remaining
+
+def record_sources(lang_code, missing_path, manifest):
+    """
+    Copies the source hashes written next to missing_translations_XX.arb
+    into the manifest so the audit can tell when the English changes again.
+    """
+    sources_path = missing_path[:-len(".arb")] + ".sources.json"
+    if not os.path.isfile(sources_path):
+        return 0
+
+    with open(sources_path, "r", encoding="utf-8") as f:
+        sources = json.load(f)
+    manifest.setdefault(lang_code, {}).update(sources)
+    return len(sources)
+
+def top_level_value_spans(arb_text):
+    """
+    Maps each top-level key of an ARB's JSON text to the (start, end) span
+    of its value. Keys nested in @metadata (e.g. "description") are skipped.
+    Works on text whose closing brace has already been removed.
+    """
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"\s*")
+    spans = {}
+
+    pos = whitespace.match(arb_text, 0).end()
+    if not arb_text.startswith("{", pos):
+        return spans
+    pos += 1
+
+    while True:
+        pos = whitespace.match(arb_text, pos).end()
+        if not arb_text.startswith('"', pos):
+            break
+        key, pos = decoder.raw_decode(arb_text, pos)
+        pos = whitespace.match(arb_text, pos).end()
+        if not arb_text.startswith(":", pos):
+            break
+        start = whitespace.match(arb_text, pos + 1).end()
+        _, end = decoder.raw_decode(arb_text, start)
+        spans[key] = (start, end)
+        pos = whitespace.match(arb_text, end).end()
+        if not arb_text.startswith(",", pos):
+            break
+        pos += 1
+
+    return spans
+
+def replace_existing_entries(target_text, entries):
+    """Rewrites the values of top-level keys already in the ARB text (stale re-translations)."""
+    spans = top_level_value_spans(target_text)
+    for key in sorted(entries, key=lambda k: spans[k][0], reverse=True):
+        start, end = spans[key]
+        replacement = json.dumps(entries[key], ensure_ascii=False)
+        target_text = target_text[:start] + replacement + target_text[end:]
+    return target_text
+
+def merge_missing_translations(shard=False):
+    """
+    Appends each app's translated missing strings (output/<app>/) to its
+    app_XX.arb files. Handles proper JSON structure and indentation.
+    With shard=True, writes per-feature shard ARBs instead.
+    """
+    for app in load_apps():
+        if not app.output_dir.is_dir():
+            print(f"⚠️ {app.name}: no output dir ({app.output_dir}) — run generate_missing_translations.py first.")
+            continue
+        print(f"\n📦 {app.name}")
+        merge_app_translations(app.output_dir, app.l10n_dir, shard)
+
+    if shard:
+        print_shard_report(shard_report(SHARDS_DIR))
+
+def merge_app_translations(output_dir, l10n_dir, shard=False):
+    """Merges the missing_translations_XX.arb files of one app."""
+    manifest = load_source_manifest(l10n_dir)
+    recorded = 0
 
     # Find all missing translation files like missing_translations_*.arb
     for filename in os.listdir(output_dir):
@@ -22,6 +127,27 @@ def merge_missing_translations():
 
         lang_code = filename.replace("missing_translations_", "").replace(".arb", "")
         missing_path = os.path.join(output_dir, filename)
+
+        if shard:
+            print(f"\n{'='*60}")
+            print(f"🧩 Merging translations for '{lang_code}' into shards")
+            print(f"Missing file: {missing_path}")
+            print(f"Shards dir:   {SHARDS_DIR}")
+            print(f"{'='*60}")
+
+            if not SHARDS_DIR.is_dir():
+                print("⚠️ No shards found — run 2_generate_arb.py --shard first.")
+                return
+
+            with open(missing_path, "r", encoding="utf-8") as f:
+                missing_data = json.load(f)
+
+            unsharded = merge_into_shards(lang_code, missing_data)
+            recorded += record_sources(lang_code, missing_path, manifest)
+            if unsharded:
+                print(f"⚠️ {len(unsharded)} keys not found in any shard: {', '.join(sorted(unsharded))}")
+            continue
+
         target_arb_path = os.path.join(l10n_dir, f"app_{lang_code}.arb")
 
         print(f"\n{'='*60}")
@@ -37,6 +163,7 @@ def merge_missing_translations():
         # Load existing ARB content
         with open(target_arb_path, "r", encoding="utf-8") as f:
             target_text = f.read().strip()
+        existing_keys = message_keys(json.loads(target_text)) if target_text else set()
 
         # Remove the last closing brace (if any)
         if target_text.endswith("}"):
@@ -46,15 +173,21 @@ def merge_missing_translations():
         with open(missing_path, "r", encoding="utf-8") as f:
             missing_data = json.load(f)
 
+        # Stale keys already exist: update their values in place
+        updated = {k: v for k, v in missing_data.items() if k in existing_keys}
+        target_text = replace_existing_entries(target_text, updated)
+
         # Prepare new formatted entries
         new_entries = []
         for key, value in missing_data.items():
+            if key in updated:
+                continue
             entry = f'  "{key}": {json.dumps(value, ensure_ascii=False)}'
             new_entries.append(entry)
         new_block = ",\n".join(new_entries)
 
         # Ensure proper comma placement
-        if not target_text.endswith("{"):
+        if new_block and not target_text.endswith("{"):
             target_text += ",\n"
 
         # Merge and close JSON again
@@ -63,11 +196,19 @@ def merge_missing_translations():
         # Clean double commas if any accident occurs
         merged_text = re.sub(r",\s*,", ",", merged_text)
 
-        # Write back
-        with open(target_arb_path, "w", encoding="utf-8") as f:
-            f.write(merged_text)
+        # Write back (atomically, so a concurrent reader never sees half a file)
+        atomic_write(target_arb_path, merged_text)
+
+        recorded += record_sources(lang_code, missing_path, manifest)
+        print(f"✅ Merged {len(missing_data) - len(updated)} new and {len(updated)} updated entries into {target_arb_path}")
 
-        print(f"✅ Merged {len(missing_data)} entries into {target_arb_path}")
+    if recorded:
+        save_source_manifest(l10n_dir, manifest)
+        print(f"📌 Recorded source hashes for {recorded} translation(s)")
 
 if __name__ == "__main__":
-    merge_missing_translations()
+    parser = argparse.ArgumentParser(description="Merge translated strings into locale ARBs.")
+    parser.add_argument("--shard", action="store_true",
+                        help="merge into per-feature shard ARBs instead of app_XX.arb")
+    args = parser.parse_args()
+    merge_missing_translations(shard=args.shard)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scan every app root listed in l10n_apps.json in one run.
+All roots share one worker pool and one extraction cache; strings that
+occur in several apps are deduplicated before translation.
+Outputs (per app):   output/<app>/custom_unlocalized.txt
+                     output/<app>/missing_strings_report.json
+Outputs (shared):    output/translation_queue.json
+"""
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from arb_utils import load_arb
+from artifact_store import write_artifact
+from detect_missing_translations import audit_app, to_translate
+from detect_unused_keys import count_references
+from extraction_cache import ExtractionCache
+from l10n_config import load_apps
+from l10n_rules import load_rules
+
+# Step scripts start with a digit, so they can't be imported by name
+extract_step = importlib.import_module("1_extract_unlocalized")
+
+# === Paths ===
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+QUEUE_FILE = OUTPUT_DIR / "translation_queue.json"
+
+RULES = load_rules()
+
+
+def list_sources(app_lib: Path) -> list:
+    """All non-generated Dart files under an app's lib dir."""
+    sources = []
+    for root, dirs, files in os.walk(app_lib):
+        dirs[:] = [d for d in dirs if d not in RULES.exclude_dirs]
+        for file in files:
+            if RULES.is_source_file(file):
+                sources.append(Path(root) / file)
+    return sorted(sources)
+
+
+def extract_worker(path: str) -> dict:
+    """
+    Pool worker: run step 1's extraction on one file and count its l10n
+    references, so coverage can be computed from the cache alone.
+    """
+    occurrences = []
+    strings = extract_step.extract_from_file(Path(path), occurrences=occurrences)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        refs = count_references(f.read())
+    return {"strings": sorted(strings), "literals": len(occurrences), "refs": dict(sorted(refs.items()))}
+
+
+def extract_all(apps: list, cache: ExtractionCache, workers: int = None) -> dict:
+    """Return {app name: {path: cache entry}} using the cache and one shared pool."""
+    per_app = {}
+    pending = {}  # digest -> path of one file with that content
+
+    for app in apps:
+        files = {}
+        for path in list_sources(app.lib):
+            digest, entry = cache.get(path)
+            files[path] = digest
+            if entry is None and digest not in pending:
+                pending[digest] = path
+        per_app[app.name] = files
+
+    if pending:
+        digests = list(pending)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(extract_worker, [str(pending[d]) for d in digests], chunksize=16)
+            for digest, entry in zip(digests, results):
+                cache.put(digest, entry)
+
+    return {
+        name: {path: cache.entries[digest] for path, digest in files.items()}
+        for name, files in per_app.items()
+    }
+
+
+def group_by_folder(app_lib: Path, file_strings: dict) -> dict:
+    """Same {folder: sorted strings} grouping as step 1."""
+    grouped = {}
+    for path, strings in file_strings.items():
+        if strings:
+            folder = str(path.parent.relative_to(app_lib))
+            grouped.setdefault(folder, set()).update(strings)
+    return {folder: sorted(strings) for folder, strings in grouped.items()}
+
+
+def missing_by_locale(app) -> dict:
+    """
+    {locale: {key: English text}} for keys each non-template locale needs
+    translated: missing ones plus stale ones whose English text changed.
+    """
+    audit = audit_app(app, record_baseline=False)
+    if audit is None:
+        return {}
+
+    en_data = load_arb(app.arb_path(app.template_locale))
+    return {
+        locale: {k: en_data[k] for k in keys}
+        for locale, keys in to_translate(*audit).items()
+    }
+
+
+def build_translation_queue(missing: dict, grouped: dict) -> dict:
+    """
+    Deduplicate work across apps: each English text is translated once per
+    locale no matter how many apps need it.
+    """
+    queue = {}
+    requests = 0
+    for app_name, locales in missing.items():
+        for locale, entries in locales.items():
+            for key, text in entries.items():
+                queue.setdefault(locale, {}).setdefault(text, []).append(f"{app_name}:{key}")
+                requests += 1
+
+    apps_by_string = {}
+    for app_name, folders in grouped.items():
+        for strings in folders.values():
+            for text in strings:
+                apps_by_string.setdefault(text, set()).add(app_name)
+    shared = {t: sorted(a) for t, a in sorted(apps_by_string.items()) if len(a) > 1}
+
+    unique = sum(len(texts) for texts in queue.values())
+    return {
+        "translate": {loc: dict(sorted(texts.items())) for loc, texts in sorted(queue.items())},
+        "shared_unlocalized": shared,
+        "stats": {"requested": requests, "unique": unique, "saved": requests - unique},
+    }
+
+
+def main():
+    started = time.perf_counter()
+    apps = load_apps()
+    print(f"🔍 Scanning {len(apps)} app root(s): {', '.join(a.name for a in apps)}\n")
+
+    cache = ExtractionCache()
+    file_entries = extract_all(apps, cache)
+    cache.save()
+    print(f"🗃️  Extraction cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+
+    grouped = {}
+    missing = {}
+    for app in apps:
+        if not app.lib.exists():
+            print(f"🚫 {app.name}: lib folder not found ({app.lib})")
+            continue
+
+        app_dir = app.output_dir
+        app_dir.mkdir(parents=True, exist_ok=True)
+
+        file_strings = {path: entry["strings"] for path, entry in file_entries[app.name].items()}
+        grouped[app.name] = group_by_folder(app.lib, file_strings)
+        print(f"\n📦 {app.name}")
+        extract_step.save_output(grouped[app.name], app_dir / "custom_unlocalized.txt")
+
+        missing[app.name] = missing_by_locale(app)
+        write_artifact(app_dir / "missing_strings_report.json", json.dumps(
+            {loc: sorted(e) for loc, e in missing[app.name].items()}, ensure_ascii=False, indent=2))
+
+    queue = build_translation_queue(missing, grouped)
+    write_artifact(QUEUE_FILE, json.dumps(queue, ensure_ascii=False, indent=2))
+
+    stats = queue["stats"]
+    print(f"\n🌍 Translation queue: {stats['unique']} unique of {stats['requested']} "
+          f"requested ({stats['saved']} deduplicated across apps)")
+    print(f"🔗 Strings shared between apps: {len(queue['shared_unlocalized'])}")
+    print(f"📄 Output: {QUEUE_FILE}")
+    print(f"⏱️  Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
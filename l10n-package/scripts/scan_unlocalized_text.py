@@ -1,86 +1,86 @@
 #!/usr/bin/env python3
 import os
-import re
+import time
 from pathlib import Path
 
+from artifact_store import write_artifact
+from l10n_config import load_apps
+from l10n_rules import load_rules
+
 # === Paths ===
-ROOT = Path(__file__).resolve().parents[3]  # go up to the project root
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-APPS = ["cng_customer"]  # only scan customer app
-
-# === Target text patterns ===
-TEXT_PATTERNS = [
-    # Widget constructors
-    r'Text\s*\(\s*["\'](.*?)["\']',
-    r'SelectableText\s*\(\s*["\'](.*?)["\']',
-    r'RichText\s*\(\s*["\'](.*?)["\']',
-    r'TextSpan\s*\(\s*text\s*:\s*["\'](.*?)["\']',
-
-    # Common properties
-    r'labelText\s*:\s*["\'](.*?)["\']',
-    r'hintText\s*:\s*["\'](.*?)["\']',
-    r'helperText\s*:\s*["\'](.*?)["\']',
-    r'errorText\s*:\s*["\'](.*?)["\']',
-    r'counterText\s*:\s*["\'](.*?)["\']',
-    r'prefixText\s*:\s*["\'](.*?)["\']',
-    r'suffixText\s*:\s*["\'](.*?)["\']',
-    r'placeholder\s*:\s*["\'](.*?)["\']',
-    r'tooltip\s*:\s*["\'](.*?)["\']',
-    r'title\s*:\s*["\'](.*?)["\']',
-    r'subtitle\s*:\s*["\'](.*?)["\']',
-    r'header\s*:\s*["\'](.*?)["\']',
-    r'footer\s*:\s*["\'](.*?)["\']',
-    r'message\s*:\s*["\'](.*?)["\']',
-    r'content\s*:\s*["\'](.*?)["\']',
-    r'buttonText\s*:\s*["\'](.*?)["\']',
-    r'cancelText\s*:\s*["\'](.*?)["\']',
-    r'confirmText\s*:\s*["\'](.*?)["\']',
-    r'label\s*:\s*["\'](.*?)["\']',
-    r'tab\s*:\s*["\'](.*?)["\']',
-    r'text\s*:\s*["\'](.*?)["\']',  # fallback catch-all
-]
-
-# Combine into one master regex
-PATTERN = re.compile("|".join(TEXT_PATTERNS), re.DOTALL)
-
-# Exclude certain lines entirely
-EXCLUDE_LINES = re.compile(r'^\s*(import|export|part|debugPrint|print|logger\.|log\.|SharedLoggingUtility\.)', re.IGNORECASE)
-
-
-def extract_ui_strings(file_path: Path):
-    """Extract only UI-relevant strings from a Dart file."""
+APPS = load_apps()  # app roots from l10n_apps.json
+
+# === Rules ===
+# Patterns and exclusions live in extraction_rules.json (shared with step 1).
+# The "scan" literal is bounded and quote-aware: the closing quote must match
+# the opening one and a literal never crosses a newline, so an unbalanced
+# quote or apostrophe can't drag a match across the file.
+RULES = load_rules()
+PATTERN = RULES.scan.combined
+EXCLUDE_LINES = RULES.exclude_line_regex
+
+# Per-file time budget (seconds); files over budget are reported as pathological
+FILE_TIME_BUDGET = 0.5
+
+
+def extract_ui_strings(file_path: Path, stats: dict = None):
+    """
+    Extract only UI-relevant strings from a Dart file.
+    Returns (strings, elapsed_seconds, over_budget). A file that exceeds
+    FILE_TIME_BUDGET stops early and keeps what was found so far.
+    """
+    started = time.perf_counter()
     with open(file_path, "r", encoding="utf-8") as f:
         content = f.read()
 
+    # Skip files with no trigger token before any regex work
+    if not RULES.scan.may_match(content):
+        if stats is not None:
+            stats["prefiltered"] = stats.get("prefiltered", 0) + 1
+        return [], time.perf_counter() - started, False
+
     # Remove excluded lines
     content = "\n".join(
-        [line for line in content.splitlines() if not EXCLUDE_LINES.match(line)]
+        [line for line in content.splitlines() if not EXCLUDE_LINES.search(line)]
     )
 
-    matches = PATTERN.findall(content)
     extracted = []
-    for match_tuple in matches:
+    over_budget = False
+    for match in PATTERN.finditer(content):
         # Each regex alternation produces a tuple; only one group is non-empty
-        for match in match_tuple:
-            text = match.strip()
+        for group in match.groups():
+            text = group.strip() if group else ""
             if text:
                 extracted.append(text)
-    return extracted
+        if time.perf_counter() - started > FILE_TIME_BUDGET:
+            over_budget = True
+            break
 
+    elapsed = time.perf_counter() - started
+    return extracted, elapsed, over_budget or elapsed > FILE_TIME_BUDGET
 
-def scan_app(app_name: str):
-    """Walk through the app folder and collect localized strings grouped by folder."""
-    app_path = ROOT / app_name / "lib"
+
+def scan_app(app):
+    """
+    Walk through the app folder and collect localized strings grouped by folder.
+    Returns (grouped, pathological) where pathological maps file -> seconds.
+    """
+    app_name = app.name
+    app_path = app.lib
     grouped = {}
+    pathological = {}
+    stats = {"files": 0, "prefiltered": 0}
 
     if not app_path.exists():
         print(f"🚫 {app_name}: lib folder not found.")
-        return grouped
+        return grouped, pathological
 
-    for root, _, files in os.walk(app_path):
-        dart_files = [f for f in files if f.endswith(".dart")]
+    for root, dirs, files in os.walk(app_path):
+        dirs[:] = [d for d in dirs if d not in RULES.exclude_dirs]
+        dart_files = [f for f in files if RULES.is_source_file(f)]
         if not dart_files:
             continue
 
@@ -89,36 +89,58 @@ def scan_app(app_name: str):
 
         for file in dart_files:
             file_path = Path(root) / file
-            folder_strings.update(extract_ui_strings(file_path))
+            stats["files"] += 1
+            strings, elapsed, over_budget = extract_ui_strings(file_path, stats)
+            folder_strings.update(strings)
+            if over_budget:
+                pathological[str(file_path.relative_to(app_path))] = elapsed
 
         if folder_strings:
             grouped[str(relative_folder)] = sorted(folder_strings)
 
-    return grouped
+    print(f"⏭️ {app_name}: prefilter skipped {stats['prefiltered']} of {stats['files']} files")
+    return grouped, pathological
 
 
 def save_grouped_strings_as_text(app_name: str, grouped: dict):
     """Save grouped strings as a readable text file."""
     out_path = OUTPUT_DIR / f"{app_name}_unlocalized.txt"
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        total = 0
-        for folder, strings in sorted(grouped.items()):
-            f.write(f"\n=== {folder} ===\n")
-            for s in sorted(strings):
-                f.write(f"- {s}\n")
-                total += 1
+    lines = []
+    total = 0
+    for folder, strings in sorted(grouped.items()):
+        lines.append(f"\n=== {folder} ===\n")
+        for s in sorted(strings):
+            lines.append(f"- {s}\n")
+            total += 1
+    write_artifact(out_path, "".join(lines))
 
     print(f"✅ {app_name}: Saved {total} UI strings → {out_path}")
 
 
+def save_pathological_files(app_name: str, pathological: dict):
+    """Save files that went over the per-file time budget, slowest first."""
+    out_path = OUTPUT_DIR / f"{app_name}_pathological_files.txt"
+
+    lines = [f"# Files over the {FILE_TIME_BUDGET:.2f}s scan budget\n"]
+    for path, elapsed in sorted(pathological.items(), key=lambda kv: -kv[1]):
+        lines.append(f"{elapsed:8.3f}s  {path}\n")
+    write_artifact(out_path, "".join(lines))
+
+    print(f"🐢 {app_name}: {len(pathological)} file(s) over the time budget → {out_path}")
+    for path, elapsed in sorted(pathological.items(), key=lambda kv: -kv[1]):
+        print(f"   {elapsed:.3f}s  {path}")
+
+
 def main():
     for app in APPS:
-        grouped = scan_app(app)
+        grouped, pathological = scan_app(app)
         if grouped:
-            save_grouped_strings_as_text(app, grouped)
+            save_grouped_strings_as_text(app.name, grouped)
         else:
-            print(f"⚠️ {app}: No UI strings found or lib folder missing.")
+            print(f"⚠️ {app.name}: No UI strings found or lib folder missing.")
+        if pathological:
+            save_pathological_files(app.name, pathological)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Preflight validator for ARB files (no Flutter toolchain needed).
+Catches in one pass what `flutter gen-l10n` would otherwise fail on one
+error at a time:
+  - invalid JSON and duplicate keys (e.g. from a text-surgery merge)
+  - keys that are not valid Dart method names
+  - malformed ICU messages (unbalanced braces, bad plural/select cases)
+  - translations using placeholders the template message doesn't have
+  - keys referenced in code but missing from the template
+Placeholders used but not declared in @key.placeholders are warnings only:
+gen-l10n infers them as Object.
+Outputs: arb_validation_report.json (exit code 1 on errors, not warnings)
+"""
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from artifact_store import write_artifact
+from detect_unused_keys import scan_references
+from l10n_config import load_apps
+
+# === Paths ===
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+REPORT_FILE = OUTPUT_DIR / "arb_validation_report.json"
+
+# === gen-l10n rules ===
+KEY_REGEX = re.compile(r'^[a-z][A-Za-z0-9_]*$')
+DART_RESERVED = {
+    "abstract", "as", "assert", "async", "await", "break", "case", "catch",
+    "class", "const", "continue", "covariant", "default", "deferred", "do",
+    "dynamic", "else", "enum", "export", "extends", "extension", "external",
+    "factory", "false", "final", "finally", "for", "Function", "get", "hide",
+    "if", "implements", "import", "in", "interface", "is", "late", "library",
+    "mixin", "new", "null", "on", "operator", "part", "required", "rethrow",
+    "return", "set", "show", "static", "super", "switch", "sync", "this",
+    "throw", "true", "try", "typedef", "var", "void", "while", "with", "yield",
+}
+PLURAL_SELECTORS = {"zero", "one", "two", "few", "many", "other"}
+SIMPLE_FORMATS = {"number", "date", "time"}
+PLACEHOLDER_TYPES = {"String", "int", "double", "num", "DateTime", "Object"}
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+SELECTOR = re.compile(r'=\d+|[A-Za-z_][A-Za-z0-9_]*')
+
+
+# === ICU message parser ===
+class ICUError(ValueError):
+    def __init__(self, message: str, pos: int):
+        super().__init__(f"{message} at offset {pos}")
+        self.pos = pos
+
+
+class _ICUParser:
+    """
+    Recursive-descent parser for the ICU subset gen-l10n accepts.
+    Nodes: ("text", str) | ("arg", name) | (kind, name, ((selector, nodes), ...))
+    where kind is "plural" or "select".
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> tuple:
+        nodes = self._nodes(depth=0)
+        if self.pos < len(self.text):
+            raise ICUError("unmatched '}'", self.pos)
+        return nodes
+
+    def _nodes(self, depth: int) -> tuple:
+        nodes = []
+        start = self.pos
+        while self.pos < len(self.text):
+            c = self.text[self.pos]
+            if c == '{':
+                if self.pos > start:
+                    nodes.append(("text", self.text[start:self.pos]))
+                nodes.append(self._argument())
+                start = self.pos
+            elif c == '}':
+                if depth == 0:
+                    raise ICUError("unmatched '}'", self.pos)
+                break
+            else:
+                self.pos += 1
+        if self.pos > start:
+            nodes.append(("text", self.text[start:self.pos]))
+        return tuple(nodes)
+
+    def _skip_ws(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def _expect(self, char: str):
+        if self.pos >= len(self.text):
+            raise ICUError(f"expected '{char}' but message ended", self.pos)
+        if self.text[self.pos] != char:
+            raise ICUError(f"expected '{char}' but found '{self.text[self.pos]}'", self.pos)
+        self.pos += 1
+
+    def _identifier(self, what: str) -> str:
+        match = IDENTIFIER.match(self.text, self.pos)
+        if not match:
+            raise ICUError(f"expected {what}", self.pos)
+        self.pos = match.end()
+        return match.group()
+
+    def _argument(self):
+        open_pos = self.pos
+        self._expect('{')
+        self._skip_ws()
+        name = self._identifier("placeholder name")
+        self._skip_ws()
+
+        if self.pos < len(self.text) and self.text[self.pos] == '}':
+            self.pos += 1
+            return ("arg", name)
+
+        self._expect(',')
+        self._skip_ws()
+        kind = self._identifier("format type")
+        self._skip_ws()
+
+        if kind in SIMPLE_FORMATS:
+            if self.pos < len(self.text) and self.text[self.pos] == ',':
+                self.pos += 1
+                end = self.text.find('}', self.pos)
+                if end == -1:
+                    raise ICUError("unclosed '{'", open_pos)
+                self.pos = end
+            self._expect('}')
+            return ("arg", name)
+
+        if kind not in ("plural", "select"):
+            raise ICUError(f"unknown format type '{kind}'", self.pos)
+
+        self._expect(',')
+        cases = {}
+        while True:
+            self._skip_ws()
+            if self.pos >= len(self.text):
+                raise ICUError("unclosed '{'", open_pos)
+            if self.text[self.pos] == '}':
+                self.pos += 1
+                break
+
+            selector_pos = self.pos
+            match = SELECTOR.match(self.text, self.pos)
+            if not match:
+                raise ICUError(f"invalid {kind} selector", self.pos)
+            selector = match.group()
+            self.pos = match.end()
+            if kind == "plural" and selector not in PLURAL_SELECTORS and not selector.startswith('='):
+                raise ICUError(f"invalid plural selector '{selector}'", selector_pos)
+            if selector in cases:
+                raise ICUError(f"duplicate {kind} case '{selector}'", selector_pos)
+
+            self._skip_ws()
+            self._expect('{')
+            cases[selector] = self._nodes(depth=1)
+            self._expect('}')
+
+        if not cases:
+            raise ICUError(f"{kind} has no cases", open_pos)
+        if "other" not in cases:
+            raise ICUError(f"{kind} is missing the required 'other' case", open_pos)
+        return (kind, name, tuple(cases.items()))
+
+
+@lru_cache(maxsize=None)
+def parse_message(message: str):
+    """Parse an ICU message once; returns (ast, error) so failures are cached too."""
+    try:
+        return _ICUParser(message).parse(), None
+    except ICUError as e:
+        return None, str(e)
+
+
+def placeholder_names(nodes) -> set:
+    """All placeholder names used anywhere in a parsed message."""
+    names = set()
+    for node in nodes:
+        if node[0] == "arg":
+            names.add(node[1])
+        elif node[0] in ("plural", "select"):
+            names.add(node[1])
+            for _, case_nodes in node[2]:
+                names |= placeholder_names(case_nodes)
+    return names
+
+
+# === ARB checks ===
+def load_strict(path: Path):
+    """Parse JSON, reporting duplicate keys instead of silently keeping the last."""
+    duplicates = []
+
+    def hook(pairs):
+        seen = set()
+        for key, _ in pairs:
+            if key in seen:
+                duplicates.append(key)
+            seen.add(key)
+        return dict(pairs)
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f, object_pairs_hook=hook)
+    return data, duplicates
+
+
+def validate_arb(data: dict, template: dict = None, warnings: list = None) -> list:
+    """
+    Validate one parsed ARB; template is None when data is the template.
+    Returns errors; non-fatal findings are appended to warnings if given.
+    """
+    errors = []
+    if warnings is None:
+        warnings = []
+    is_template = template is None
+
+    for key, value in data.items():
+        if key.startswith('@'):
+            if key.startswith('@@'):
+                continue
+            if key[1:] not in data:
+                errors.append(f"{key}: metadata for a key that does not exist")
+            elif not isinstance(value, dict):
+                errors.append(f"{key}: metadata must be an object")
+            continue
+
+        if not is_template and key not in template:
+            errors.append(f"{key}: not present in the template ARB")
+            continue
+        if not KEY_REGEX.match(key) or key in DART_RESERVED:
+            errors.append(f"{key}: not a valid Dart method name (must match {KEY_REGEX.pattern} and not be a keyword)")
+        if not isinstance(value, str):
+            errors.append(f"{key}: value must be a string")
+            continue
+
+        ast, error = parse_message(value)
+        if error:
+            errors.append(f"{key}: ICU syntax error: {error}")
+            continue
+
+        used = placeholder_names(ast)
+        meta = (data if is_template else template).get(f"@{key}", {})
+        declared = meta.get("placeholders", {}) if isinstance(meta, dict) else {}
+        if not isinstance(declared, dict):
+            errors.append(f"@{key}: placeholders must be an object")
+            continue
+
+        if is_template:
+            for name in sorted(used - declared.keys()):
+                warnings.append(f"{key}: placeholder '{name}' is not declared in @{key}.placeholders (inferred as Object)")
+            for name, spec in declared.items():
+                if not isinstance(spec, dict):
+                    errors.append(f"@{key}: placeholder '{name}' must be an object")
+                elif "type" in spec and spec["type"] not in PLACEHOLDER_TYPES:
+                    errors.append(f"@{key}: placeholder '{name}' has unknown type '{spec['type']}'")
+        else:
+            # The template's placeholders: declared ones plus any it infers
+            template_value = template[key]
+            template_ast = parse_message(template_value)[0] if isinstance(template_value, str) else None
+            allowed = declared.keys() | placeholder_names(template_ast or ())
+            for name in sorted(used - allowed):
+                errors.append(f"{key}: placeholder '{name}' is not a placeholder of the template message")
+
+    return errors
+
+
+def validate_app(app, warnings: dict = None) -> dict:
+    """
+    Validate every locale ARB of an app; returns {file: [errors]}.
+    Warnings are collected into warnings ({file: [warnings]}) if given.
+    """
+    results = {}
+    parsed = {}
+    if warnings is None:
+        warnings = {}
+
+    for locale in app.locales:
+        path = app.arb_path(locale)
+        name = str(path)
+        if not path.is_file():
+            results[name] = ["file not found"]
+            continue
+        try:
+            data, duplicates = load_strict(path)
+        except json.JSONDecodeError as e:
+            results[name] = [f"invalid JSON: {e.msg} (line {e.lineno}, column {e.colno})"]
+            continue
+        parsed[locale] = data
+        results[name] = [f"{k}: duplicate key" for k in duplicates]
+
+    template = parsed.get(app.template_locale)
+    for locale, data in parsed.items():
+        name = str(app.arb_path(locale))
+        if template is None and locale != app.template_locale:
+            continue
+        file_warnings = []
+        results[name] += validate_arb(data, None if locale == app.template_locale else template, file_warnings)
+        if file_warnings:
+            warnings[name] = file_warnings
+
+    if template is not None and app.lib.exists():
+        template_keys = {k for k in template if not k.startswith('@')}
+        references = scan_references(app.lib)
+        name = str(app.arb_path(app.template_locale))
+        for key in sorted(set(references) - template_keys):
+            results[name].append(f"{key}: referenced in code ({references[key]}x) but missing")
+
+    return {name: errors for name, errors in results.items() if errors}
+
+
+def main():
+    started = time.perf_counter()
+    report = {}
+    warnings = {}
+
+    for app in load_apps():
+        report.update(validate_app(app, warnings))
+
+    write_artifact(REPORT_FILE, json.dumps(
+        {"errors": report, "warnings": warnings}, ensure_ascii=False, indent=2))
+
+    total = sum(len(errors) for errors in report.values())
+    for name, found in warnings.items():
+        print(f"\n⚠️  {name} ({len(found)} warning(s))")
+        for warning in found:
+            print(f"   {warning}")
+    for name, errors in report.items():
+        print(f"\n❌ {name} ({len(errors)})")
+        for error in errors:
+            print(f"   {error}")
+
+    elapsed = time.perf_counter() - started
+    cache = parse_message.cache_info()
+    print(f"\n⏱️  Validated in {elapsed:.3f}s ({cache.currsize} messages parsed, {cache.hits} cache hits)")
+    print(f"📄 Output: {REPORT_FILE}")
+    if total:
+        print(f"❌ {total} error(s) — flutter gen-l10n would fail")
+        sys.exit(1)
+    print("✅ All ARB files valid")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from detect_unused_keys import build_report, count_references  # noqa: E402
+
+SOURCE = """\
+import 'package:numu/l10n/l10n.dart';
+export 'package:numu/l10n/app_localizations.dart';
+
+class HabitTile extends StatelessWidget {
+  @override
+  Widget build(BuildContext context) {
+    // Text(context.l10n.commentedOut),
+    /* Text(context.l10n.blockCommented) */
+    return Column(children: [
+      Text(context.l10n.addHabit),
+      Text(AppLocalizations.of(context)!.deleteHabit),
+      Text(context.l10n.missingKey),
+      Text(context.l10n.localeName),
+      Text(context.l10n.printReport),
+      TextButton(onPressed: () => print('tapped'), child: Text(context.l10n.fingerprintUnlock)),
+    ]);
+  }
+}
+"""
+
+
+class CountReferencesTest(unittest.TestCase):
+    def test_ignores_imports_and_comments(self):
+        counts = count_references(SOURCE)
+        self.assertEqual(dict(counts), {
+            "addHabit": 1,
+            "deleteHabit": 1,
+            "missingKey": 1,
+            "printReport": 1,
+            "fingerprintUnlock": 1,
+        })
+
+    def test_counts_references_on_lines_mentioning_print_or_log(self):
+        counts = count_references("log.info(context.l10n.syncFailed);\ndebugPrint(l10n.printReport);\n")
+        self.assertEqual(dict(counts), {"syncFailed": 1, "printReport": 1})
+
+    def test_dangling_only_reports_real_references(self):
+        known = {"addHabit", "deleteHabit", "printReport", "fingerprintUnlock", "unusedKey"}
+        report = build_report(count_references(SOURCE), known)
+        self.assertEqual(report["dangling"], ["missingKey"])
+        self.assertEqual(report["unused"], ["unusedKey"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import importlib
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+replace_step = importlib.import_module("3_replace_incode")
+extract_step = importlib.import_module("1_extract_unlocalized")
+
+
+def occurrence(source: bytes, literal: str, key: str, **extra) -> dict:
+    return {"offset": source.index(literal.encode("utf-8")), "literal": literal, "key": key, **extra}
+
+
+class ConstContextsTest(unittest.TestCase):
+    def test_token_end_covers_escaped_quotes(self):
+        source = b"Text('Today\\'s Prayers', style: s)"
+        (end, drops), = replace_step.const_contexts(source, {5}).values()
+        self.assertEqual(source[5:end], b"'Today\\'s Prayers'")
+        self.assertEqual(drops, [])
+
+    def test_token_end_covers_nested_quotes_and_interpolation(self):
+        source = b"Text(\"Total: ${n}${unit != null ? ' ${unit}' : ''}\")"
+        (end, _), = replace_step.const_contexts(source, {5}).values()
+        self.assertEqual(end, len(source) - 1)
+
+    def test_const_keywords_to_drop(self):
+        source = b"return const Padding(child: const Text('Hi'));"
+        offset = source.index(b"'Hi'")
+        _, drops = replace_step.const_contexts(source, {offset})[offset]
+        self.assertEqual([source[a:b] for a, b in drops], [b"const ", b"const "])
+
+    def test_const_declaration(self):
+        source = b"static const title = Text('Hi');"
+        offset = source.index(b"'Hi'")
+        self.assertIsNone(replace_step.const_contexts(source, {offset})[offset][1])
+
+
+class PatchFileTest(unittest.TestCase):
+    def patch(self, source: bytes, occurrences: list):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page.dart"
+            path.write_bytes(source)
+            applied, rejected, dropped = replace_step.patch_file(path, occurrences)
+            return path.read_bytes(), applied, [reason for _, reason in rejected], dropped
+
+    def test_replaces_whole_literal_and_drops_const(self):
+        source = b"const Text('Today\\'s Prayers')"
+        patched, applied, rejected, dropped = self.patch(
+            source, [occurrence(source, "'Today\\'s Prayers'", "todaysPrayers")])
+        self.assertEqual(patched, b"Text(context.l10n.todaysPrayers)")
+        self.assertEqual((len(applied), rejected, dropped), (1, [], 1))
+
+    def test_rejects_literal_cut_at_inner_quote(self):
+        # What a quote-unaware pattern records for these strings
+        source = b"Text('Today\\'s Prayers');\nhelperText: 'Describe \"quality\"',"
+        patched, applied, rejected, _ = self.patch(source, [
+            occurrence(source, "'Today\\'", "today"),
+            occurrence(source, "'Describe \"", "describe"),
+        ])
+        self.assertEqual(patched, source)
+        self.assertEqual((applied, rejected), ([], ["not the whole string"] * 2))
+
+    def test_rejects_adjacent_string_concatenation(self):
+        source = b"Text('Location denied. '\n    'Open settings.')"
+        patched, applied, rejected, _ = self.patch(
+            source, [occurrence(source, "'Location denied. '", "locationDenied")])
+        self.assertEqual(patched, source)
+        self.assertEqual(rejected, ["not the whole string"])
+
+    def test_interpolated_literal_gets_arguments(self):
+        source = b"Text('Hi ${user.name}!')"
+        patched, _, rejected, _ = self.patch(
+            source, [occurrence(source, "'Hi ${user.name}!'", "hiName", args=["user.name"])])
+        self.assertEqual(patched, b"Text(context.l10n.hiName(user.name))")
+        self.assertEqual(rejected, [])
+
+
+class ExtractLiteralTest(unittest.TestCase):
+    def extract(self, source: str) -> list:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page.dart"
+            path.write_text(source, encoding="utf-8")
+            occurrences = []
+            extract_step.extract_from_file(path, occurrences=occurrences)
+            return [(literal, text) for _, literal, text, _ in occurrences]
+
+    def test_literal_spans_escaped_and_nested_quotes(self):
+        found = self.extract(
+            "Text('Today\\'s Prayers');\n"
+            "Text(\"Don't give up\");\n"
+            "Text('Describe what makes this habit \"quality\"');\n"
+        )
+        self.assertEqual(found, [
+            ("'Today\\'s Prayers'", "Today's Prayers"),
+            ("\"Don't give up\"", "Don't give up"),
+            ("'Describe what makes this habit \"quality\"'", 'Describe what makes this habit "quality"'),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()